@@ -7,7 +7,7 @@ echo "How many slots do you want to use: "
 read slots
 echo -e "\e[1;34m$slots are going to be used\e[0m"
 
-echo "Enter method (send_receive, reduce, or both): "
+echo "Enter method (send_receive, send_receive_irecv, send_receive_combined, send_receive_tree, reduce, reduce_buffer, pipelined, dynamic, hierarchical, rma, both, gather or all): "
 read method
 echo -e "\e[1;34m$method method(s) is/are going to be used\e[0m"
 
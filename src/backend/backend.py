@@ -0,0 +1,199 @@
+import multiprocessing
+import numpy as np
+
+try:
+    import mpi4py
+    # MPI is only initialised once the mpi backend asks for the world communicator: the local backend forks its
+    # ranks, which an initialised MPI process must not do.
+    mpi4py.rc.initialize = False
+    mpi4py.rc.finalize = True
+    from mpi4py import MPI
+except ImportError:
+    MPI = None
+
+BACKENDS = ("mpi", "local")
+if MPI is not None:
+    SUM, MAX = MPI.SUM, MPI.MAX
+    ANY_SOURCE, ANY_TAG = MPI.ANY_SOURCE, MPI.ANY_TAG
+else:
+    SUM, MAX = "sum", "max"
+    ANY_SOURCE, ANY_TAG = -1, -1
+# Collectives travel on a negative tag, which a receive for ANY_TAG never matches.
+COLLECTIVE_TAG = -2
+LOCAL_COUNTERS = 64
+
+
+def world_communicator():
+    if MPI is None:
+        raise ImportError("The mpi backend needs mpi4py; use --backend local to run without it")
+    if not MPI.Is_initialized():
+        MPI.Init_thread()
+    return MPI.COMM_WORLD
+
+
+def is_local(comm):
+    return getattr(comm, "backend", "mpi") == "local"
+
+
+def combine(op, a, b):
+    return np.maximum(a, b) if op == MAX else a + b
+
+
+class WindowCounter:
+    # A single int64 in rank 0's window; every rank (rank 0 included) increments it with Fetch_and_op.
+    def __init__(self, comm):
+        self.window = MPI.Win.Allocate(8 if comm.rank == 0 else 0, disp_unit=8, comm=comm)
+        if comm.rank == 0:
+            self.window.Lock(0)
+            self.window.Put(np.zeros(1, dtype=np.int64), 0)
+            self.window.Unlock(0)
+        comm.Barrier()
+
+    def fetch_add(self, value=1):
+        increment = np.array([value], dtype=np.int64)
+        previous = np.empty(1, dtype=np.int64)
+        self.window.Lock(0, MPI.LOCK_SHARED)
+        self.window.Fetch_and_op(increment, previous, 0, 0, MPI.SUM)
+        self.window.Unlock(0)
+        return int(previous[0])
+
+    def free(self):
+        self.window.Free()
+
+
+class LocalCounter:
+    def __init__(self, counters, index):
+        self.counters = counters
+        self.index = index
+
+    def fetch_add(self, value=1):
+        with self.counters.get_lock():
+            previous = self.counters[self.index]
+            self.counters[self.index] = previous + value
+        return previous
+
+    def free(self):
+        pass
+
+
+def make_shared_counter(comm):
+    # Must be called collectively, like an MPI window, so every rank gets the same counter.
+    if is_local(comm):
+        return comm.shared_counter()
+    return WindowCounter(comm)
+
+
+class LocalWorld:
+    def __init__(self, size):
+        self.size = size
+        self.inboxes = [multiprocessing.Queue() for _ in range(size)]
+        self.barrier = multiprocessing.Barrier(size)
+        self.counters = multiprocessing.Array("q", LOCAL_COUNTERS)
+
+
+class LocalCommunicator:
+    # The subset of an mpi4py communicator that the portable estimation methods use, for processes
+    # started by run_local. Every rank has one inbox queue; messages that arrive before they are
+    # received wait in a pending list, like MPI's unexpected message queue.
+    backend = "local"
+
+    def __init__(self, world, rank):
+        self.world = world
+        self.rank = rank
+        self.size = world.size
+        self.pending = []
+        self.counters_allocated = 0
+
+    def send(self, obj, dest, tag=0):
+        self.world.inboxes[dest].put((self.rank, tag, obj))
+
+    def recv(self, buf=None, source=ANY_SOURCE, tag=ANY_TAG):
+        for i, (sender, sent_tag, obj) in enumerate(self.pending):
+            if self.matches(sender, sent_tag, source, tag):
+                del self.pending[i]
+                return obj
+        while True:
+            sender, sent_tag, obj = self.world.inboxes[self.rank].get()
+            if self.matches(sender, sent_tag, source, tag):
+                return obj
+            self.pending.append((sender, sent_tag, obj))
+
+    @staticmethod
+    def matches(sender, sent_tag, source, tag):
+        if tag == ANY_TAG:
+            return sent_tag >= 0 and source in (ANY_SOURCE, sender)
+        return sent_tag == tag and source in (ANY_SOURCE, sender)
+
+    def Send(self, buf, dest, tag=0):
+        self.send(np.array(buf), dest, tag)
+
+    def Recv(self, buf, source=ANY_SOURCE, tag=ANY_TAG):
+        np.copyto(buf, self.recv(source=source, tag=tag))
+
+    def Barrier(self):
+        self.world.barrier.wait()
+
+    def bcast(self, obj, root=0):
+        if self.rank == root:
+            for dest in range(self.size):
+                if dest != root:
+                    self.send(obj, dest, COLLECTIVE_TAG)
+            return obj
+        return self.recv(source=root, tag=COLLECTIVE_TAG)
+
+    def gather(self, obj, root=0):
+        if self.rank != root:
+            self.send(obj, root, COLLECTIVE_TAG)
+            return None
+        return [obj if source == root else self.recv(source=source, tag=COLLECTIVE_TAG)
+                for source in range(self.size)]
+
+    def reduce(self, obj, op=SUM, root=0):
+        values = self.gather(obj, root)
+        if values is None:
+            return None
+        result = values[0]
+        for value in values[1:]:
+            result = combine(op, result, value)
+        return result
+
+    def allgather(self, obj):
+        return self.bcast(self.gather(obj, root=0), root=0)
+
+    def allreduce(self, obj, op=SUM):
+        return self.bcast(self.reduce(obj, op, root=0), root=0)
+
+    def Reduce(self, sendbuf, recvbuf, op=SUM, root=0):
+        result = self.reduce(np.array(sendbuf), op, root)
+        if result is not None:
+            np.copyto(recvbuf, result)
+
+    def Allreduce(self, sendbuf, recvbuf, op=SUM):
+        np.copyto(recvbuf, self.allreduce(np.array(sendbuf), op))
+
+    def Allgather(self, sendbuf, recvbuf):
+        np.copyto(recvbuf, np.stack(self.allgather(np.array(sendbuf))))
+
+    def shared_counter(self):
+        index = self.counters_allocated
+        if index >= LOCAL_COUNTERS:
+            raise RuntimeError(f"The local backend only provides {LOCAL_COUNTERS} shared counters")
+        # Every rank creates its counters in the same order, so the same index names the same counter.
+        self.counters_allocated += 1
+        return LocalCounter(self.world.counters, index)
+
+
+def run_rank(target, world, rank, args, kwargs):
+    target(*args, comm=LocalCommunicator(world, rank), **kwargs)
+
+
+def run_local(target, size, *args, **kwargs):
+    # Starts size processes that each call target(*args, comm=<their communicator>, **kwargs), like mpirun -n size.
+    world = LocalWorld(size)
+    processes = [multiprocessing.Process(target=run_rank, args=(target, world, rank, args, kwargs))
+                 for rank in range(size)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return max(process.exitcode for process in processes)
@@ -0,0 +1,177 @@
+import sys
+import os
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(project_dir)
+
+from src.estimation.estimation import make_dart_thrower, DART_KERNELS, DART_CHUNK_SIZE, BIT_GENERATORS
+from src.results.results import standard_error
+
+
+def benchmark_kernel(dart_thrower, num_darts, repeats=3):
+    best_time = float("inf")
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        dart_thrower(num_darts)
+        best_time = min(best_time, time.perf_counter() - start_time)
+    return num_darts / best_time
+
+
+def benchmark_kernels(num_darts, repeats=3, kernels=DART_KERNELS, chunk_size=DART_CHUNK_SIZE):
+    return {kernel: benchmark_kernel(make_dart_thrower(kernel, chunk_size=chunk_size), num_darts, repeats)
+            for kernel in kernels}
+
+
+def benchmark_bit_generators(num_darts, repeats=3, bit_generators=BIT_GENERATORS, chunk_size=DART_CHUNK_SIZE):
+    return {bit_generator: benchmark_kernel(make_dart_thrower("numpy", bit_generator=bit_generator,
+                                                              chunk_size=chunk_size), num_darts, repeats)
+            for bit_generator in bit_generators}
+
+
+def benchmark_threads(num_darts, repeats=3, thread_counts=(1, 2, 4), chunk_size=DART_CHUNK_SIZE):
+    results = {}
+    for threads in thread_counts:
+        dart_thrower = make_dart_thrower("numpy", chunk_size=chunk_size, threads=threads)
+        results[threads] = benchmark_kernel(dart_thrower, num_darts, repeats)
+        if hasattr(dart_thrower, "close"):
+            dart_thrower.close()
+    return results
+
+
+def check_samplers(num_darts, chunk_sizes=(1, 2, 3, 7, DART_CHUNK_SIZE),
+                   samplers=("uniform", "antithetic", "stratified"), seed=12345, tolerance=5):
+    # Every sampler must converge for any chunk size, including the ones too small to hold a full antithetic pair.
+    # The plain Monte Carlo standard error is an upper bound for the variance-reduced samplers.
+    results = {}
+    for sampler in samplers:
+        for chunk_size in chunk_sizes:
+            dart_thrower = make_dart_thrower("numpy", np.random.SeedSequence(seed), chunk_size=chunk_size,
+                                             sampler=sampler)
+            pi_estimate = 4 * dart_thrower(num_darts) / num_darts
+            deviation = abs(pi_estimate - np.pi) / standard_error(np.pi, num_darts)
+            results[sampler, chunk_size] = pi_estimate, deviation, deviation <= tolerance
+    return results
+
+
+def import_times(*command):
+    # Cumulative -X importtime of every top-level import the command makes, in seconds.
+    result = subprocess.run([sys.executable, "-X", "importtime", *command], capture_output=True, text=True,
+                            cwd=project_dir)
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit() or fields[2].startswith("  "):
+            continue
+        times[fields[2].strip()] = int(fields[1]) / 1e6
+    return times
+
+
+def benchmark_startup():
+    return {
+        "main.py": import_times(os.path.join("src", "main.py"), "--help"),
+        "reporting (rank 0 only)": import_times("-c", "import matplotlib.pyplot, openpyxl"),
+    }
+
+
+def export_excel(mode, num_rows, rows_per_iteration=20):
+    # Runs in a fresh process so that its peak RSS belongs to one export mode only.
+    import numpy as np
+    from src.results.results import ResultsTable, COLUMNS, TEXT_COLUMNS
+    from src.excel.excel import (ExcelStream, create_excel_sheet, write_to_excel, write_summary_sheet, summarize,
+                                 save_excel)
+
+    rng = np.random.default_rng(0)
+    data = ResultsTable()
+    stream = ExcelStream() if mode == "streaming" else None
+    write_time = 0.0
+    for start in range(0, num_rows, rows_per_iteration):
+        for row in range(start, min(num_rows, start + rows_per_iteration)):
+            data.append([f"method_{row % rows_per_iteration}" if column == "Method" else "uniform"
+                         if column in TEXT_COLUMNS else rng.random() for column in COLUMNS])
+        if stream:
+            write_start = time.perf_counter()
+            stream.write(data)
+            write_time += time.perf_counter() - write_start
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "results.xlsx")
+        save_start = time.perf_counter()
+        if stream:
+            stream.save(filename)
+        else:
+            wb, sheet = create_excel_sheet()
+            write_to_excel(sheet, data)
+            write_summary_sheet(wb, summarize(data))
+            save_excel(wb, filename)
+        save_time = time.perf_counter() - save_start
+    return write_time, save_time, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark_excel(num_rows, modes=("standard", "streaming")):
+    results = {}
+    for mode in modes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results[mode] = executor.submit(export_excel, mode, num_rows).result()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the darts/sec of the dart throwing kernels on one core")
+    parser.add_argument("--darts", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=DART_CHUNK_SIZE)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--check-darts", type=int, default=200_000,
+                        help="darts per sampler and chunk size in the convergence check")
+    parser.add_argument("--excel-rows", type=int, default=20_000,
+                        help="result rows exported to compare the standard and streaming Excel modes")
+    args = parser.parse_args()
+
+    print(f"{'Sampler':<12}{'Chunk':>8}{'Pi Estimate':>14}{'Std Errors':>12}")
+    sampler_results = check_samplers(args.check_darts)
+    for (sampler, chunk_size), (pi_estimate, deviation, converged) in sampler_results.items():
+        print(f"{sampler:<12}{chunk_size:>8}{pi_estimate:>14.6f}{deviation:>12.2f}"
+              + ("" if converged else "  FAILED"))
+    print()
+
+    results = benchmark_kernels(args.darts, args.repeats, chunk_size=args.chunk_size)
+    baseline = results["python"]
+    print(f"{'Kernel':<10}{'Darts/sec':>16}{'Speedup':>10}")
+    for kernel, darts_per_second in results.items():
+        print(f"{kernel:<10}{darts_per_second:>16,.0f}{darts_per_second / baseline:>9.1f}x")
+
+    print()
+    print(f"{'Generator':<10}{'Darts/sec':>16}")
+    for bit_generator, darts_per_second in benchmark_bit_generators(args.darts, args.repeats,
+                                                                    chunk_size=args.chunk_size).items():
+        print(f"{bit_generator:<10}{darts_per_second:>16,.0f}")
+
+    print()
+    print(f"{'Threads':<10}{'Darts/sec':>16}{'Speedup':>10}")
+    thread_results = benchmark_threads(args.darts, args.repeats, args.threads, chunk_size=args.chunk_size)
+    baseline = thread_results[args.threads[0]]
+    for threads, darts_per_second in thread_results.items():
+        print(f"{threads:<10}{darts_per_second:>16,.0f}{darts_per_second / baseline:>9.1f}x")
+
+    print()
+    print(f"{'Imports':<28}{'Total (s)':>10}  Slowest")
+    for name, times in benchmark_startup().items():
+        slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:3]
+        print(f"{name:<28}{sum(times.values()):>10.3f}  "
+              + ", ".join(f"{module} {seconds:.3f}" for module, seconds in slowest))
+
+    print()
+    print(f"{'Excel mode':<12}{'Rows':>10}{'Write (s)':>11}{'Save (s)':>10}{'Peak RSS (MiB)':>16}")
+    for mode, (write_time, save_time, peak_rss) in benchmark_excel(args.excel_rows).items():
+        print(f"{mode:<12}{args.excel_rows:>10,}{write_time:>11.2f}{save_time:>10.2f}{peak_rss:>16.1f}")
+
+    if not all(converged for _, _, converged in sampler_results.values()):
+        sys.exit(1)
@@ -0,0 +1,200 @@
+import sys
+import os
+import shlex
+import argparse
+import subprocess
+import openpyxl
+
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(project_dir)
+
+from src.utils.utils import generate_timestamp, logger, positive_int, non_negative_int
+from src.results.results import COLUMNS
+from src.excel.excel import save_excel
+from src.plot.plot import plot_scaling
+from src.backend.backend import BACKENDS
+from src.estimation.estimation import MPI_ONLY_METHODS
+
+SCALING_MODES = ("strong", "weak")
+SCALING_COLUMNS = ["Mode", "Backend", "Ranks", "Threads per Rank", "Method", "Total Darts", "Darts per Rank",
+                   "Time Taken (s)", "Time Std (s)", "Pi Estimate", "Speedup", "Efficiency", "Startup Time (s)"]
+
+
+def darts_per_rank(mode, total_darts, ranks, base_ranks):
+    # Strong scaling splits a fixed total over the ranks; weak scaling keeps the base run's share per rank.
+    if mode == "strong":
+        return max(1, total_darts // ranks)
+    return max(1, total_darts // base_ranks)
+
+
+def run_main(ranks, method, num_darts_per_process, filename, hostfile="hostfile", mpirun_args=(), trials=3,
+             warmup=1, seed=None, timeout=600, threads_per_rank=1, backend="mpi"):
+    # One sweep iteration: max_darts equals the first batch, so main.py stops right after it.
+    command = [sys.executable, os.path.join(project_dir, "src", "main.py"), method,
+               str(num_darts_per_process * ranks), str(num_darts_per_process), str(timeout), "False",
+               "--batch", "--output", filename, "--trials", str(trials), "--warmup", str(warmup),
+               "--threads-per-rank", str(threads_per_rank)]
+    if backend == "local":
+        command += ["--backend", "local", "--jobs", str(ranks)]
+    else:
+        command = ["mpirun", "-n", str(ranks), "--hostfile", hostfile, "--map-by", ":OVERSUBSCRIBE", *mpirun_args,
+                   *command]
+    if seed is not None:
+        command += ["--seed", str(seed)]
+    # Run files carry no timestamp, so a workbook left over from an earlier run must not pass for this one.
+    if os.path.exists(filename):
+        os.remove(filename)
+    try:
+        subprocess.run(command, cwd=project_dir, env={**os.environ, "DEBUG_MODE": "false"}, check=True,
+                       stdout=subprocess.DEVNULL, timeout=timeout)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        logger(f"Run with {ranks} ranks of {method} failed: {e}", level="error")
+        return None
+    if not os.path.exists(filename):
+        logger(f"Run with {ranks} ranks of {method} wrote no results", level="error")
+        return None
+    return read_run(filename, method)
+
+
+def read_run(filename, method):
+    wb = openpyxl.load_workbook(filename, read_only=True)
+    try:
+        for row in wb.worksheets[0].iter_rows(min_row=2, values_only=True):
+            values = dict(zip(COLUMNS, row))
+            if values["Method"] == method and values["Time Taken (s)"] is not None:
+                return values
+    finally:
+        wb.close()
+    return None
+
+
+def scaling_metrics(results):
+    # Speedup and efficiency are relative to the smallest rank count of each (mode, method, darts) series.
+    series = {}
+    for result in results:
+        series.setdefault((result["Mode"], result["Method"], result["Series"]), []).append(result)
+    for (mode, _, _), runs in series.items():
+        runs.sort(key=lambda result: result["Ranks"])
+        base = runs[0]
+        for result in runs:
+            ratio = base["Time Taken (s)"] / result["Time Taken (s)"]
+            if mode == "strong":
+                result["Speedup"] = ratio * base["Ranks"]
+                result["Efficiency"] = ratio * base["Ranks"] / result["Ranks"]
+            else:
+                result["Speedup"] = ratio * result["Ranks"]
+                result["Efficiency"] = ratio
+    return results
+
+
+def run_matrix(ranks, methods, darts, modes, output_dir, **run_options):
+    base_ranks = min(ranks)
+    threads = run_options.get("threads_per_rank", 1)
+    backend = run_options.get("backend", "mpi")
+    if backend == "local":
+        skipped = [method for method in methods if method in MPI_ONLY_METHODS]
+        methods = [method for method in methods if method not in MPI_ONLY_METHODS]
+        if skipped:
+            logger(f"The local backend cannot run: {', '.join(skipped)}", level="warning")
+    runs = {}
+    results = []
+    for mode in modes:
+        for total_darts in darts:
+            for method in methods:
+                for num_ranks in sorted(ranks):
+                    per_rank = darts_per_rank(mode, total_darts, num_ranks, base_ranks)
+                    # The base run of a strong and a weak series is the same configuration; it only runs once.
+                    key = (num_ranks, method, per_rank)
+                    if key not in runs:
+                        filename = os.path.join(output_dir, "runs",
+                                                f"{backend}_{method}_{num_ranks}x{threads}_{per_rank}.xlsx")
+                        logger(f"{mode} scaling: {method} on {num_ranks} ranks with {per_rank} darts per rank")
+                        runs[key] = run_main(num_ranks, method, per_rank, filename, **run_options)
+                    if runs[key] is None:
+                        continue
+                    results.append({
+                        "Mode": mode,
+                        "Backend": backend,
+                        "Ranks": num_ranks,
+                        "Threads per Rank": threads,
+                        "Method": method,
+                        "Series": total_darts,
+                        "Total Darts": per_rank * num_ranks,
+                        "Darts per Rank": per_rank,
+                        "Time Taken (s)": runs[key]["Time Taken (s)"],
+                        "Time Std (s)": runs[key]["Time Std (s)"],
+                        "Pi Estimate": runs[key]["Pi Estimate"],
+                        "Startup Time (s)": runs[key]["Startup Time (s)"],
+                    })
+    return scaling_metrics(results)
+
+
+def write_scaling_excel(results, filename):
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for mode in SCALING_MODES:
+        rows = [result for result in results if result["Mode"] == mode]
+        if not rows:
+            continue
+        sheet = wb.create_sheet(f"{mode.capitalize()} Scaling")
+        sheet.append(SCALING_COLUMNS)
+        for result in rows:
+            sheet.append([result[column] for column in SCALING_COLUMNS])
+    return save_excel(wb, filename)
+
+
+def print_scaling_table(results):
+    for mode in SCALING_MODES:
+        rows = [result for result in results if result["Mode"] == mode]
+        if not rows:
+            continue
+        print(f"{mode.capitalize()} scaling")
+        print(f"{'Method':<24}{'Ranks':>6}{'Total Darts':>14}{'Time (s)':>12}{'Speedup':>10}{'Efficiency':>12}"
+              f"{'Startup (s)':>13}")
+        for result in rows:
+            print(f"{result['Method']:<24}{result['Ranks']:>6}{result['Total Darts']:>14,}"
+                  f"{result['Time Taken (s)']:>12.4f}{result['Speedup']:>9.2f}x{result['Efficiency']:>11.0%}"
+                  f"{result['Startup Time (s)']:>13.3f}")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run main.py over a matrix of rank counts, methods and dart "
+                                                 "totals and report strong and weak scaling")
+    parser.add_argument("--ranks", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--methods", nargs="+", default=["send_receive", "reduce"])
+    parser.add_argument("--darts", type=int, nargs="+", default=[1_000_000],
+                        help="total darts of a strong scaling run; a weak scaling run throws the base run's "
+                             "share on every rank")
+    parser.add_argument("--modes", nargs="+", choices=SCALING_MODES, default=list(SCALING_MODES))
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=non_negative_int, default=None)
+    parser.add_argument("--threads-per-rank", type=positive_int, default=1,
+                        help="threads per rank; compare against a run with ranks multiplied by this value")
+    parser.add_argument("--backend", choices=BACKENDS, default="mpi",
+                        help="local runs every configuration with main.py's process backend instead of mpirun")
+    parser.add_argument("--hostfile", default="hostfile")
+    parser.add_argument("--mpirun-args", default="",
+                        help="extra mpirun arguments, e.g. --mpirun-args=\"--allow-run-as-root\"")
+    parser.add_argument("--timeout", type=int, default=600, help="seconds before a single run is abandoned")
+    parser.add_argument("--output-dir", default=os.path.join(".", "scaling"))
+    args = parser.parse_args()
+
+    output_dir = os.path.abspath(args.output_dir)
+    results = run_matrix(args.ranks, args.methods, args.darts, args.modes, output_dir,
+                         hostfile=os.path.abspath(args.hostfile), mpirun_args=shlex.split(args.mpirun_args),
+                         trials=args.trials, warmup=args.warmup, seed=args.seed, timeout=args.timeout,
+                         threads_per_rank=args.threads_per_rank, backend=args.backend)
+    if not results:
+        logger("No scaling run finished", level="error")
+        sys.exit(1)
+
+    print_scaling_table(results)
+    timestamp = generate_timestamp()
+    filename_excel = os.path.join(output_dir, f"scaling_{timestamp}.xlsx")
+    filename_plot = os.path.join(output_dir, f"scaling_plot_{timestamp}.png")
+    if write_scaling_excel(results, filename_excel):
+        logger(f"Scaling data saved at: {filename_excel}")
+    plot_scaling(results, filename_plot)
+    logger(f"Scaling graph saved at: {filename_plot}")
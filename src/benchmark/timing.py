@@ -0,0 +1,20 @@
+import time
+import statistics
+from src.backend.backend import MAX
+
+
+def measure(comm, func, *args, **kwargs):
+    # Every rank starts the region together and rank 0 gets the slowest rank's time.
+    comm.Barrier()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    return result, comm.reduce(elapsed, op=MAX, root=0)
+
+
+def time_statistics(times):
+    return {
+        "Time Median (s)": statistics.median(times),
+        "Time Std (s)": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "Trials": len(times),
+    }
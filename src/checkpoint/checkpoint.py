@@ -0,0 +1,54 @@
+import os
+import time
+import pickle
+import tempfile
+
+CHECKPOINT_FILE = os.path.join(".", "checkpoints", "sweep.pkl")
+CHECKPOINT_VERSION = 2
+# A resumed run must throw darts exactly like the run that wrote the checkpoint.
+CHECKPOINT_SETTINGS = ("methods", "samplers", "size", "threads_per_rank", "sweep", "kernel", "bit_generator")
+
+
+def save_checkpoint(filename, state):
+    # The checkpoint is written to a temporary file next to it and renamed over the old one, so a run that dies
+    # while writing still leaves the previous checkpoint behind.
+    directory = os.path.dirname(os.path.abspath(filename))
+    os.makedirs(directory, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix=".checkpoint_")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            pickle.dump({"version": CHECKPOINT_VERSION, **state}, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, filename)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return filename
+
+
+def load_checkpoint(filename, settings):
+    # Returns (checkpoint, None) or (None, reason) so that rank 0 can tell every rank why it cannot resume.
+    if not os.path.exists(filename):
+        return None, f"No checkpoint found at {filename}"
+    with open(filename, "rb") as file:
+        checkpoint = pickle.load(file)
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        return None, f"{filename} was written by an incompatible version"
+    for setting in CHECKPOINT_SETTINGS:
+        if checkpoint["settings"][setting] != settings[setting]:
+            return None, (f"{filename} was written with {setting}={checkpoint['settings'][setting]}, "
+                          f"not {settings[setting]}")
+    return checkpoint, None
+
+
+class CheckpointTimer:
+    def __init__(self, interval):
+        self.interval = interval
+        self.last = time.time()
+
+    def due(self):
+        return bool(self.interval) and time.time() - self.last >= self.interval
+
+    def reset(self):
+        self.last = time.time()
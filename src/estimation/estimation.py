@@ -1,27 +1,93 @@
 import numpy as np
-from mpi4py import MPI
 import random
+import contextlib
+import copy
+import functools
+import itertools
+import math
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from src.backend.backend import MPI, SUM, make_shared_counter
 
+DART_KERNELS = ("numpy", "python")
+SAMPLERS = ("uniform", "antithetic", "stratified", "halton", "sobol")
+DART_CHUNK_SIZE = 65536
+BIT_GENERATORS = {
+    "pcg64dxsm": np.random.PCG64DXSM,
+    "pcg64": np.random.PCG64,
+    "philox": np.random.Philox,
+    "sfc64": np.random.SFC64,
+    "mt19937": np.random.MT19937,
+}
+TREE_TAG = 1
+IRECV_TAG_BASE = 100
+# Every Irecv gather gets its own tag so ANY_SOURCE never matches a message from a later iteration.
+_irecv_epochs = itertools.count()
+PHASES = ("compute", "communication", "idle")
+# Seconds this rank spent in every phase since the last take_phase_times(); None while phase timing is off.
+_phase_times = None
 
-def estimate_pi_send_receive(num_darts_per_process, comm):
-    darts_inside_circle = throw_darts(num_darts_per_process)
+
+def enable_phase_timing(enabled=True):
+    global _phase_times
+    _phase_times = dict.fromkeys(PHASES, 0.0) if enabled else None
+
+
+def take_phase_times():
+    if _phase_times is None:
+        return None
+    times = [_phase_times[phase] for phase in PHASES]
+    _phase_times.update(dict.fromkeys(PHASES, 0.0))
+    return times
+
+
+@contextlib.contextmanager
+def timed_phase(phase):
+    if _phase_times is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phase_times[phase] += time.perf_counter() - start
+
+
+def wait_for_peers(comm):
+    # With phase timing on, the ranks meet at a barrier before communicating, so waiting for the slowest
+    # rank is booked as idle time instead of inflating the communication time.
+    if _phase_times is not None:
+        with timed_phase("idle"):
+            comm.Barrier()
+
+
+def estimate_pi_send_receive(num_darts_per_process, comm, dart_thrower=None, stats=None, gather="p2p"):
+    dart_thrower = dart_thrower or throw_darts
+    with timed_phase("compute"):
+        darts_inside_circle = dart_thrower(num_darts_per_process)
+
+    wait_for_peers(comm)
+    with timed_phase("communication"):
+        totals = GATHER_STRATEGIES[gather](darts_inside_circle, num_darts_per_process, comm)
 
     if comm.rank == 0:
-        total_darts_inside_circle, total_darts_per_process = gather_results(darts_inside_circle, num_darts_per_process,
-                                                                            comm)
-        total_darts = total_darts_per_process
-        pi_estimate = 4 * total_darts_inside_circle / total_darts
+        total_darts_inside_circle, total_darts = totals
+        pi_estimate = 4 * int(total_darts_inside_circle) / int(total_darts)
         return pi_estimate
     else:
-        send_results(darts_inside_circle, num_darts_per_process, comm)
         return None
 
 
-def estimate_pi_reduce(num_darts_per_process, comm):
-    darts_inside_circle = throw_darts(num_darts_per_process)
+def estimate_pi_reduce(num_darts_per_process, comm, dart_thrower=None, stats=None):
+    dart_thrower = dart_thrower or throw_darts
+    with timed_phase("compute"):
+        darts_inside_circle = dart_thrower(num_darts_per_process)
 
-    total_darts_inside_circle = comm.reduce(darts_inside_circle, op=MPI.SUM, root=0)
-    total_darts_per_process = comm.reduce(num_darts_per_process, op=MPI.SUM, root=0)
+    wait_for_peers(comm)
+    with timed_phase("communication"):
+        total_darts_inside_circle = comm.reduce(darts_inside_circle, op=SUM, root=0)
+        total_darts_per_process = comm.reduce(num_darts_per_process, op=SUM, root=0)
 
     if comm.rank == 0:
         total_darts = total_darts_per_process
@@ -31,6 +97,287 @@ def estimate_pi_reduce(num_darts_per_process, comm):
         return None
 
 
+def estimate_pi_reduce_buffer(num_darts_per_process, comm, dart_thrower=None, stats=None, collective="reduce"):
+    dart_thrower = dart_thrower or throw_darts
+    with timed_phase("compute"):
+        counts = np.array([dart_thrower(num_darts_per_process), num_darts_per_process], dtype=np.int64)
+    totals = np.empty_like(counts)
+
+    wait_for_peers(comm)
+    with timed_phase("communication"):
+        if collective == "allreduce":
+            comm.Allreduce(counts, totals, op=SUM)
+        else:
+            comm.Reduce(counts, totals, op=SUM, root=0)
+
+    if comm.rank == 0:
+        total_darts_inside_circle, total_darts = totals
+        pi_estimate = 4 * int(total_darts_inside_circle) / int(total_darts)
+        return pi_estimate
+    else:
+        return None
+
+
+class PipelinedReduce:
+    def __init__(self, comm, dart_thrower=None, collective="reduce"):
+        self.comm = comm
+        self.dart_thrower = dart_thrower or throw_darts
+        self.collective = collective
+        self.iteration = 0
+        self.pending = None
+
+    def __call__(self, num_darts_per_process, stats=None):
+        # The caller may tag the iteration so that repeated trials report the sweep's iteration number;
+        # it is read before complete() overwrites the stats with the previous iteration's.
+        iteration = stats.get("Iteration", self.iteration) if stats is not None else self.iteration
+
+        # The previous iteration's reduction is still in flight while this iteration's darts are thrown.
+        compute_start = time.perf_counter()
+        with timed_phase("compute"):
+            counts = np.array([self.dart_thrower(num_darts_per_process), num_darts_per_process], dtype=np.int64)
+        compute_time = time.perf_counter() - compute_start
+
+        pi_estimate = self.complete(stats, overlap_time=compute_time)
+
+        totals = np.empty_like(counts)
+        with timed_phase("communication"):
+            if self.collective == "allreduce":
+                request = self.comm.Iallreduce(counts, totals, op=MPI.SUM)
+            else:
+                request = self.comm.Ireduce(counts, totals, op=MPI.SUM, root=0)
+        self.pending = (request, counts, totals, iteration, num_darts_per_process, compute_time)
+        self.iteration += 1
+        return pi_estimate
+
+    def flush(self, stats=None):
+        return self.complete(stats, overlap_time=0.0)
+
+    def complete(self, stats, overlap_time):
+        if self.pending is None:
+            return None
+        request, counts, totals, iteration, num_darts_per_process, compute_time = self.pending
+        self.pending = None
+
+        # No barrier here: it would serialise the overlap, so the whole wait is booked as idle time.
+        wait_start = time.perf_counter()
+        with timed_phase("idle"):
+            request.Wait()
+        wait_time = time.perf_counter() - wait_start
+
+        if self.comm.rank != 0:
+            return None
+        if stats is not None:
+            # Rank 0's own compute and wait for the reported batch; the timed trial belongs to the next batch,
+            # so the caller's Time Taken is left alone.
+            stats.update({
+                "Iteration": iteration,
+                "Batch Time (s)": compute_time + wait_time,
+                "Num Darts": int(totals[1]),
+                "Dart Step": num_darts_per_process,
+                "Overlap Time (s)": overlap_time,
+                "Wait Time (s)": wait_time,
+            })
+        return 4 * int(totals[0]) / int(totals[1])
+
+
+class DynamicWorkSharing:
+    def __init__(self, comm, dart_thrower=None, tasks_per_rank=16, incremental=False):
+        self.comm = comm
+        self.dart_thrower = dart_thrower or throw_darts
+        self.tasks_per_rank = tasks_per_rank
+        # In an incremental sweep only the darts added since the last iteration are handed out as tasks.
+        self.incremental = incremental
+        self.darts_budgeted = 0
+        self.cumulative_totals = np.zeros(2, dtype=np.float64)
+        # Every rank (rank 0 included) pulls tasks from one shared counter.
+        self.task_counter = make_shared_counter(comm)
+        self.task_offset = 0
+
+    def __call__(self, num_darts_per_process, stats=None):
+        total_darts = (num_darts_per_process - self.darts_budgeted) * self.comm.size
+        if self.incremental:
+            self.darts_budgeted = num_darts_per_process
+        task_size = max(1, -(-total_darts // (self.comm.size * self.tasks_per_rank)))
+        num_tasks = -(-total_darts // task_size)
+
+        darts_inside_circle = 0
+        darts_thrown = 0
+        tasks_done = 0
+        compute_time = 0.0
+        while True:
+            with timed_phase("communication"):
+                task = self.task_counter.fetch_add(1) - self.task_offset
+            if task >= num_tasks:
+                break
+            num_darts = min(task_size, total_darts - task * task_size)
+            compute_start = time.perf_counter()
+            with timed_phase("compute"):
+                darts_inside_circle += self.dart_thrower(num_darts)
+            compute_time += time.perf_counter() - compute_start
+            darts_thrown += num_darts
+            tasks_done += 1
+
+        # Every rank fetches exactly one task past the end, and the Allgather keeps the next
+        # iteration from pulling tasks before this one is drained.
+        self.task_offset += num_tasks + self.comm.size
+        local = np.array([darts_inside_circle, darts_thrown, tasks_done, compute_time], dtype=np.float64)
+        per_rank = np.empty((self.comm.size, 4), dtype=np.float64)
+        wait_for_peers(self.comm)
+        with timed_phase("communication"):
+            self.comm.Allgather(local, per_rank)
+
+        if self.comm.rank != 0:
+            return None
+        totals = per_rank[:, :2].sum(axis=0)
+        if self.incremental:
+            self.cumulative_totals += totals
+            totals = self.cumulative_totals
+        tasks = per_rank[:, 2]
+        throughput = np.divide(per_rank[:, 1], per_rank[:, 3], out=np.zeros(self.comm.size),
+                               where=per_rank[:, 3] > 0)
+        if stats is not None:
+            stats.update({
+                "Min Tasks": int(tasks.min()),
+                "Max Tasks": int(tasks.max()),
+                "Min Throughput (darts/s)": float(throughput.min()),
+                "Max Throughput (darts/s)": float(throughput.max()),
+                # (tasks, darts, throughput) of every rank; the caller keeps these in its per-rank table.
+                "Per-Rank Tasks": list(zip(tasks.astype(np.int64).tolist(), per_rank[:, 1].astype(np.int64).tolist(),
+                                           throughput.tolist())),
+            })
+        return 4 * totals[0] / totals[1]
+
+    def close(self):
+        self.task_counter.free()
+
+
+class HierarchicalReduce:
+    def __init__(self, comm, dart_thrower=None):
+        self.comm = comm
+        self.dart_thrower = dart_thrower or throw_darts
+        self.node_comm = comm.Split_type(MPI.COMM_TYPE_SHARED, key=comm.rank)
+        is_leader = self.node_comm.rank == 0
+        self.leader_comm = comm.Split(0 if is_leader else MPI.UNDEFINED, key=comm.rank)
+
+        # Two slots per rank, alternated between iterations, so a rank can publish its next counts
+        # while the node leader is still summing the previous ones.
+        node_size = self.node_comm.size
+        self.window = MPI.Win.Allocate_shared(2 * node_size * 2 * 8 if is_leader else 0, disp_unit=8,
+                                              comm=self.node_comm)
+        memory, _ = self.window.Shared_query(0)
+        self.counters = np.ndarray(buffer=memory, dtype=np.int64, shape=(2, node_size, 2))
+        self.window.Lock_all()
+        self.parity = 0
+
+    def __call__(self, num_darts_per_process, stats=None):
+        with timed_phase("compute"):
+            darts_inside_circle = self.dart_thrower(num_darts_per_process)
+
+        intra_start = time.perf_counter()
+        with timed_phase("communication"):
+            self.counters[self.parity, self.node_comm.rank] = darts_inside_circle, num_darts_per_process
+            self.window.Sync()
+        # The node barrier is where a rank waits for its slower neighbours.
+        with timed_phase("idle"):
+            self.node_comm.Barrier()
+        self.window.Sync()
+        node_totals = self.counters[self.parity].sum(axis=0) if self.node_comm.rank == 0 else None
+        self.parity = 1 - self.parity
+        intra_time = time.perf_counter() - intra_start
+
+        if node_totals is None:
+            return None
+
+        inter_start = time.perf_counter()
+        totals = np.empty_like(node_totals)
+        with timed_phase("communication"):
+            self.leader_comm.Reduce(node_totals, totals, op=MPI.SUM, root=0)
+        inter_time = time.perf_counter() - inter_start
+
+        if self.comm.rank != 0:
+            return None
+        if stats is not None:
+            stats.update({
+                "Nodes": self.leader_comm.size,
+                "Intra-node Time (s)": intra_time,
+                "Inter-node Time (s)": inter_time,
+            })
+        return 4 * int(totals[0]) / int(totals[1])
+
+    def close(self):
+        self.window.Unlock_all()
+        self.window.Free()
+        if self.leader_comm != MPI.COMM_NULL:
+            self.leader_comm.Free()
+        self.node_comm.Free()
+
+
+class RmaAccumulate:
+    # Rank 0's window holds two slots of [generation, hits, darts, arrivals], one per iteration parity.
+    SLOT_SIZE = 4
+
+    def __init__(self, comm, dart_thrower=None):
+        self.comm = comm
+        self.dart_thrower = dart_thrower or throw_darts
+        self.window = MPI.Win.Allocate(2 * self.SLOT_SIZE * 8 if comm.rank == 0 else 0, disp_unit=8, comm=comm)
+        if comm.rank == 0:
+            self.window.Lock(0)
+            self.window.Put(np.array([0, 0, 0, 0, 1, 0, 0, 0], dtype=np.int64), 0)
+            self.window.Unlock(0)
+        comm.Barrier()
+        self.iteration = 0
+
+    def __call__(self, num_darts_per_process, stats=None):
+        with timed_phase("compute"):
+            darts_inside_circle = self.dart_thrower(num_darts_per_process)
+        slot = (self.iteration % 2) * self.SLOT_SIZE
+
+        # A rank only waits here when it is two iterations ahead of rank 0.
+        with timed_phase("idle"):
+            while self.read(slot, 1)[0] != self.iteration:
+                pass
+
+        with timed_phase("communication"):
+            self.window.Lock(0, MPI.LOCK_SHARED)
+            self.window.Accumulate(np.array([darts_inside_circle, num_darts_per_process], dtype=np.int64), 0,
+                                   target=slot + 1, op=MPI.SUM)
+            self.window.Flush(0)
+            self.window.Accumulate(np.ones(1, dtype=np.int64), 0, target=slot + 3, op=MPI.SUM)
+            self.window.Unlock(0)
+        self.iteration += 1
+
+        if self.comm.rank != 0:
+            return None
+
+        wait_start = time.perf_counter()
+        with timed_phase("idle"):
+            while self.read(slot + 3, 1)[0] != self.comm.size:
+                pass
+        wait_time = time.perf_counter() - wait_start
+
+        with timed_phase("communication"):
+            total_darts_inside_circle, total_darts = self.read(slot + 1, 2)
+            self.window.Lock(0, MPI.LOCK_SHARED)
+            self.window.Accumulate(np.array([self.iteration + 1, 0, 0, 0], dtype=np.int64), 0,
+                                   target=slot, op=MPI.REPLACE)
+            self.window.Unlock(0)
+
+        if stats is not None:
+            stats["Wait Time (s)"] = wait_time
+        return 4 * int(total_darts_inside_circle) / int(total_darts)
+
+    def read(self, disp, count):
+        values = np.empty(count, dtype=np.int64)
+        self.window.Lock(0, MPI.LOCK_SHARED)
+        self.window.Get_accumulate(np.empty(count, dtype=np.int64), values, 0, target=disp,
+                                   op=MPI.NO_OP)
+        self.window.Unlock(0)
+        return values
+
+    def close(self):
+        self.window.Free()
+
+
 def gather_results(darts_inside_circle, num_darts_per_process, comm):
     total_darts_inside_circle = darts_inside_circle
     total_darts_per_process = num_darts_per_process
@@ -47,7 +394,374 @@ def send_results(darts_inside_circle, num_darts_per_process, comm):
     comm.send(num_darts_per_process, dest=0)
 
 
-def throw_darts(num_darts):
+def gather_point_to_point(darts_inside_circle, num_darts_per_process, comm):
+    if comm.rank == 0:
+        return gather_results(darts_inside_circle, num_darts_per_process, comm)
+    send_results(darts_inside_circle, num_darts_per_process, comm)
+    return None
+
+
+def gather_irecv(darts_inside_circle, num_darts_per_process, comm):
+    tag = IRECV_TAG_BASE + next(_irecv_epochs) % 32000
+    counts = np.array([darts_inside_circle, num_darts_per_process], dtype=np.int64)
+    if comm.rank != 0:
+        comm.Send(counts, dest=0, tag=tag)
+        return None
+
+    received = np.empty((comm.size - 1, 2), dtype=np.int64)
+    requests = [comm.Irecv(received[i], source=MPI.ANY_SOURCE, tag=tag) for i in range(comm.size - 1)]
+    MPI.Request.Waitall(requests)
+    return counts + received.sum(axis=0)
+
+
+def gather_combined(darts_inside_circle, num_darts_per_process, comm):
+    if comm.rank != 0:
+        comm.send((darts_inside_circle, num_darts_per_process), dest=0)
+        return None
+
+    total_darts_inside_circle = darts_inside_circle
+    total_darts_per_process = num_darts_per_process
+    for i in range(1, comm.size):
+        received_darts_inside_circle, received_darts_per_process = comm.recv(source=i)
+        total_darts_inside_circle += received_darts_inside_circle
+        total_darts_per_process += received_darts_per_process
+    return total_darts_inside_circle, total_darts_per_process
+
+
+def gather_tree(darts_inside_circle, num_darts_per_process, comm):
+    counts = np.array([darts_inside_circle, num_darts_per_process], dtype=np.int64)
+    received = np.empty_like(counts)
+    step = 1
+    while step < comm.size:
+        if comm.rank & step:
+            comm.Send(counts, dest=comm.rank - step, tag=TREE_TAG)
+            return None
+        if comm.rank + step < comm.size:
+            comm.Recv(received, source=comm.rank + step, tag=TREE_TAG)
+            counts += received
+        step *= 2
+    return counts
+
+
+class IncrementalDartThrower:
+    def __init__(self, dart_thrower):
+        self.dart_thrower = dart_thrower
+        self.darts_thrown = 0
+        self.darts_inside_circle = 0
+
+    def __call__(self, num_darts):
+        # num_darts is the cumulative count; only the darts added since the last call are thrown.
+        if num_darts > self.darts_thrown:
+            self.darts_inside_circle += self.dart_thrower(num_darts - self.darts_thrown)
+            self.darts_thrown = num_darts
+        return self.darts_inside_circle
+
+
+def make_scratch_buffer(chunk_size=DART_CHUNK_SIZE):
+    return np.empty(2 * chunk_size, dtype=np.float64), np.empty(chunk_size, dtype=np.bool_)
+
+
+def count_inside(x, y, inside):
+    # x and y are overwritten; the caller's scratch buffers are reused for every chunk.
+    np.multiply(x, x, out=x)
+    np.multiply(y, y, out=y)
+    np.add(x, y, out=x)
+    np.less_equal(x, 1.0, out=inside[:len(x)])
+    return int(np.count_nonzero(inside[:len(x)]))
+
+
+def throw_darts(num_darts, rng=None, chunk_size=DART_CHUNK_SIZE, scratch=None):
+    rng = rng if rng is not None else np.random.default_rng()
+    coordinates, inside = scratch if scratch is not None else make_scratch_buffer(chunk_size)
+    darts_inside_circle = 0
+    remaining = num_darts
+    while remaining > 0:
+        chunk = min(chunk_size, remaining)
+        # Darts land in the unit quadrant, which hits the quarter circle with the same probability
+        # as the full [-1, 1] square while sparing the affine transform.
+        rng.random(out=coordinates[:2 * chunk])
+        darts_inside_circle += count_inside(coordinates[:chunk], coordinates[chunk:2 * chunk], inside)
+        remaining -= chunk
+    return darts_inside_circle
+
+
+def throw_darts_antithetic(num_darts, rng=None, chunk_size=DART_CHUNK_SIZE, scratch=None):
+    rng = rng if rng is not None else np.random.default_rng()
+    coordinates, inside = scratch if scratch is not None else make_scratch_buffer(chunk_size)
+    if chunk_size < 2:
+        # A pair needs four coordinates, but the scratch buffer only holds 2 * chunk_size.
+        return throw_darts(num_darts, rng, chunk_size, (coordinates, inside))
+    darts_inside_circle = 0
+    remaining = num_darts
+    while remaining > 1:
+        pairs = min(chunk_size // 2, remaining // 2)
+        rng.random(out=coordinates[:2 * pairs])
+        x = coordinates[:pairs]
+        y = coordinates[pairs:2 * pairs]
+        x_mirror = coordinates[2 * pairs:3 * pairs]
+        y_mirror = coordinates[3 * pairs:4 * pairs]
+        np.subtract(1.0, x, out=x_mirror)
+        np.subtract(1.0, y, out=y_mirror)
+        darts_inside_circle += count_inside(x, y, inside) + count_inside(x_mirror, y_mirror, inside)
+        remaining -= 2 * pairs
+    if remaining:
+        darts_inside_circle += throw_darts(remaining, rng, chunk_size, (coordinates, inside))
+    return darts_inside_circle
+
+
+def throw_darts_stratified(num_darts, rng=None, chunk_size=DART_CHUNK_SIZE, scratch=None, rank=0, size=1):
+    # The quadrant is cut into one horizontal band per rank, and each rank jitters one dart into
+    # every cell of a grid x grid lattice over its band; leftover darts land uniformly in the band.
+    rng = rng if rng is not None else np.random.default_rng()
+    coordinates, inside = scratch if scratch is not None else make_scratch_buffer(chunk_size)
+    grid = math.isqrt(num_darts)
+    cells = grid * grid
+    darts_inside_circle = 0
+    for start in range(0, num_darts, chunk_size):
+        chunk = min(chunk_size, num_darts - start)
+        rng.random(out=coordinates[:2 * chunk])
+        x = coordinates[:chunk]
+        y = coordinates[chunk:2 * chunk]
+        stratified = max(0, min(chunk, cells - start))
+        if stratified:
+            cell = np.arange(start, start + stratified)
+            x[:stratified] += cell % grid
+            x[:stratified] /= grid
+            y[:stratified] += cell // grid
+            y[:stratified] /= grid
+        y += rank
+        y /= size
+        darts_inside_circle += count_inside(x, y, inside)
+    return darts_inside_circle
+
+
+class QuasiRandomDarts:
+    # Every rank walks its own disjoint segment of one randomised low-discrepancy sequence.
+    SEGMENT_SIZES = {"halton": 2 ** 40, "sobol": 2 ** 30}
+
+    def __init__(self, sequence, seed_sequence, rank=0, size=1, chunk_size=DART_CHUNK_SIZE):
+        if sequence == "sobol":
+            # scipy.stats takes most of a second to import, so only ranks that draw Sobol points load it.
+            try:
+                from scipy.stats import qmc
+            except ImportError:
+                raise ImportError("The sobol sampler needs scipy")
+            self.qmc = qmc
+        self.sequence = sequence
+        self.rank = rank
+        self.chunk_size = chunk_size
+        self.segment = self.SEGMENT_SIZES[sequence] // size
+        # The randomisation is drawn from the root entropy so that all ranks share the same sequence.
+        self.shared_rng = np.random.default_rng(np.random.SeedSequence(seed_sequence.entropy))
+        self.inside = np.empty(chunk_size, dtype=np.bool_)
+        self.randomise()
+
+    def randomise(self):
+        self.position = 0
+        if self.sequence == "sobol":
+            self.engine = self.qmc.Sobol(d=2, scramble=True, seed=self.shared_rng)
+            if self.rank:
+                self.engine.fast_forward(self.rank * self.segment)
+        else:
+            self.shift = self.shared_rng.random(2)
+
+    def __call__(self, num_darts):
+        darts_inside_circle = 0
+        remaining = num_darts
+        while remaining > 0:
+            if self.position == self.segment:
+                # A used-up segment starts over under a fresh randomisation: an independent replicate.
+                self.randomise()
+            chunk = min(self.chunk_size, remaining, self.segment - self.position)
+            points = self.points(chunk)
+            darts_inside_circle += count_inside(points[:, 0], points[:, 1], self.inside)
+            self.position += chunk
+            remaining -= chunk
+        return darts_inside_circle
+
+    def state(self):
+        # Sobol engines spawn their generator from the shared one, so the whole generator is copied, not just its
+        # bit generator state.
+        randomisation = self.engine if self.sequence == "sobol" else self.shift
+        return copy.deepcopy((self.shared_rng, randomisation, self.position))
+
+    def restore(self, state):
+        self.shared_rng, randomisation, self.position = state
+        if self.sequence == "sobol":
+            self.engine = randomisation
+        else:
+            self.shift = randomisation
+
+    def points(self, chunk):
+        if self.sequence == "sobol":
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                return np.ascontiguousarray(self.engine.random(chunk))
+        indices = np.arange(chunk, dtype=np.int64) + self.rank * self.segment + self.position
+        points = np.empty((chunk, 2))
+        for dimension, base in enumerate((2, 3)):
+            points[:, dimension] = radical_inverse(indices, base)
+        points += self.shift
+        np.mod(points, 1.0, out=points)
+        return points
+
+
+class ThreadedDartThrower:
+    # Every thread owns its generator and scratch buffers; numpy drops the GIL while filling and counting them.
+    def __init__(self, dart_throwers):
+        self.dart_throwers = dart_throwers
+        self.executor = ThreadPoolExecutor(max_workers=len(dart_throwers))
+
+    def __call__(self, num_darts):
+        # Every thread gets an equal share so that the stratified bands stay evenly filled.
+        share, remainder = divmod(num_darts, len(self.dart_throwers))
+        futures = [self.executor.submit(dart_thrower, share + (i < remainder))
+                   for i, dart_thrower in enumerate(self.dart_throwers)]
+        return sum(future.result() for future in futures)
+
+    def close(self):
+        self.executor.shutdown()
+
+
+def radical_inverse(indices, base):
+    result = np.zeros(len(indices))
+    factor = 1.0 / base
+    for _ in range(math.ceil(math.log(int(indices[-1]) + 1, base)) + 1):
+        indices, digits = np.divmod(indices, base)
+        result += digits * factor
+        factor /= base
+    return result
+
+
+def throw_darts_python(num_darts, rng=random):
     darts_inside_circle = sum(
-        1 for _ in range(num_darts) if random.uniform(-1, 1) ** 2 + random.uniform(-1, 1) ** 2 <= 1)
+        1 for _ in range(num_darts) if rng.uniform(-1, 1) ** 2 + rng.uniform(-1, 1) ** 2 <= 1)
     return darts_inside_circle
+
+
+def spawn_seed_sequence(seed, comm):
+    entropy = comm.bcast(seed if seed is not None else np.random.SeedSequence().entropy, root=0)
+    return entropy, np.random.SeedSequence(entropy).spawn(comm.size)[comm.rank]
+
+
+def make_dart_thrower(kernel="numpy", seed_sequence=None, bit_generator="pcg64dxsm", chunk_size=DART_CHUNK_SIZE,
+                      sampler="uniform", rank=0, size=1, threads=1):
+    seed_sequence = seed_sequence if seed_sequence is not None else np.random.SeedSequence()
+    if chunk_size < 1:
+        raise ValueError(f"The chunk size must be at least 1, not {chunk_size}")
+    if threads > 1:
+        # Threads act as extra ranks: thread t of a rank takes virtual rank rank * threads + t of size * threads,
+        # so stratified bands and quasi-random segments stay disjoint across all threads of all ranks.
+        return ThreadedDartThrower([make_dart_thrower(kernel, child, bit_generator, chunk_size, sampler,
+                                                      rank * threads + thread, size * threads)
+                                    for thread, child in enumerate(seed_sequence.spawn(threads))])
+    if kernel == "python":
+        if sampler != "uniform":
+            raise ValueError(f"The python kernel only supports the uniform sampler, not {sampler}")
+        return functools.partial(throw_darts_python,
+                                 rng=random.Random(int(seed_sequence.generate_state(1, np.uint64)[0])))
+    if kernel != "numpy":
+        raise ValueError(f"Unknown dart kernel: {kernel}")
+
+    if sampler in ("halton", "sobol"):
+        return QuasiRandomDarts(sampler, seed_sequence, rank, size, chunk_size)
+    rng = np.random.Generator(BIT_GENERATORS[bit_generator](seed_sequence))
+    scratch = make_scratch_buffer(chunk_size)
+    if sampler == "uniform":
+        return functools.partial(throw_darts, rng=rng, chunk_size=chunk_size, scratch=scratch)
+    if sampler == "antithetic":
+        return functools.partial(throw_darts_antithetic, rng=rng, chunk_size=chunk_size, scratch=scratch)
+    if sampler == "stratified":
+        return functools.partial(throw_darts_stratified, rng=rng, chunk_size=chunk_size, scratch=scratch,
+                                 rank=rank, size=size)
+    raise ValueError(f"Unknown sampler: {sampler}")
+
+
+def random_state(dart_thrower):
+    # What a checkpoint needs to continue a dart thrower's stream where it stopped.
+    if isinstance(dart_thrower, ThreadedDartThrower):
+        return [random_state(thread_thrower) for thread_thrower in dart_thrower.dart_throwers]
+    if isinstance(dart_thrower, QuasiRandomDarts):
+        return dart_thrower.state()
+    rng = dart_thrower.keywords["rng"]
+    return rng.bit_generator.state if isinstance(rng, np.random.Generator) else rng.getstate()
+
+
+def restore_random_state(dart_thrower, state):
+    if isinstance(dart_thrower, ThreadedDartThrower):
+        for thread_thrower, thread_state in zip(dart_thrower.dart_throwers, state):
+            restore_random_state(thread_thrower, thread_state)
+    elif isinstance(dart_thrower, QuasiRandomDarts):
+        dart_thrower.restore(state)
+    else:
+        rng = dart_thrower.keywords["rng"]
+        if isinstance(rng, np.random.Generator):
+            rng.bit_generator.state = state
+        else:
+            rng.setstate(state)
+
+
+def sweep_state(estimate_pi):
+    # The running totals an incremental sweep carries from one iteration to the next; None in an independent sweep.
+    if isinstance(estimate_pi, DynamicWorkSharing):
+        return estimate_pi.darts_budgeted, estimate_pi.cumulative_totals.copy()
+    dart_thrower = (estimate_pi.keywords["dart_thrower"] if isinstance(estimate_pi, functools.partial)
+                    else estimate_pi.dart_thrower)
+    if isinstance(dart_thrower, IncrementalDartThrower):
+        return dart_thrower.darts_thrown, dart_thrower.darts_inside_circle
+    return None
+
+
+def restore_sweep_state(estimate_pi, state):
+    if state is None:
+        return
+    if isinstance(estimate_pi, DynamicWorkSharing):
+        estimate_pi.darts_budgeted, estimate_pi.cumulative_totals = state
+        return
+    dart_thrower = (estimate_pi.keywords["dart_thrower"] if isinstance(estimate_pi, functools.partial)
+                    else estimate_pi.dart_thrower)
+    dart_thrower.darts_thrown, dart_thrower.darts_inside_circle = state
+
+
+GATHER_STRATEGIES = {
+    "p2p": gather_point_to_point,
+    "irecv": gather_irecv,
+    "combined": gather_combined,
+    "tree": gather_tree,
+}
+ESTIMATION_METHODS = {
+    "send_receive": estimate_pi_send_receive,
+    "send_receive_irecv": functools.partial(estimate_pi_send_receive, gather="irecv"),
+    "send_receive_combined": functools.partial(estimate_pi_send_receive, gather="combined"),
+    "send_receive_tree": functools.partial(estimate_pi_send_receive, gather="tree"),
+    "reduce": estimate_pi_reduce,
+    "reduce_buffer": estimate_pi_reduce_buffer,
+    "pipelined": PipelinedReduce,
+    "dynamic": DynamicWorkSharing,
+    "hierarchical": HierarchicalReduce,
+    "rma": RmaAccumulate,
+}
+# These methods rely on nonblocking collectives, RMA windows or communicator splits that only MPI provides.
+MPI_ONLY_METHODS = ("send_receive_irecv", "pipelined", "hierarchical", "rma")
+SWEEP_MODES = ("independent", "incremental")
+METHOD_GROUPS = {
+    "both": ("send_receive", "reduce"),
+    "gather": ("send_receive", "send_receive_irecv", "send_receive_combined", "send_receive_tree"),
+    "all": tuple(ESTIMATION_METHODS),
+}
+
+
+def resolve_methods(method_sel):
+    return METHOD_GROUPS.get(method_sel, (method_sel,))
+
+
+def make_estimator(method, comm, dart_thrower, sweep="independent", **options):
+    estimator = ESTIMATION_METHODS[method]
+    if sweep == "incremental":
+        if estimator is DynamicWorkSharing:
+            options["incremental"] = True
+        else:
+            dart_thrower = IncrementalDartThrower(dart_thrower)
+    if isinstance(estimator, type):
+        return estimator(comm, dart_thrower, **options)
+    return functools.partial(estimator, comm=comm, dart_thrower=dart_thrower, **options)
@@ -1,21 +1,90 @@
 import openpyxl
 import os
 from src.utils.utils import logger
+from src.results.results import COLUMNS, PHASE_COLUMNS, TASK_COLUMNS, SUMMARY_COLUMNS, MethodSummary
 
 
 def create_excel_sheet():
     wb = openpyxl.Workbook()
     sheet = wb.active
     sheet.title = "Pi Estimation Data"
-    sheet.append(["Iteration", "Pi Estimate", "Time Taken (s)", "Num Darts", "Dart Step", "Method"])
+    sheet.append(COLUMNS)
     return wb, sheet
 
 
 def write_to_excel(sheet, data):
-    for row in data:
+    for row in data.records():
         sheet.append(row)
 
 
+def write_phase_sheet(wb, phase_data):
+    sheet = wb.create_sheet("Per-Rank Phases")
+    sheet.append(PHASE_COLUMNS)
+    for row in phase_data.records():
+        sheet.append(row)
+    return sheet
+
+
+def write_task_sheet(wb, task_data):
+    sheet = wb.create_sheet("Per-Rank Tasks")
+    sheet.append(TASK_COLUMNS)
+    for row in task_data.records():
+        sheet.append(row)
+    return sheet
+
+
+def write_summary_sheet(wb, summary):
+    sheet = wb.create_sheet("Method Summary")
+    sheet.append(SUMMARY_COLUMNS)
+    for row in summary.rows():
+        sheet.append(row)
+    return sheet
+
+
+def summarize(data):
+    summary = MethodSummary()
+    for row in data.records():
+        summary.add(row)
+    return summary
+
+
+class ExcelStream:
+    # A write-only workbook keeps no cell objects: every appended row goes straight to a temporary file,
+    # so rows are handed over once they are final and the summary is folded in on the way.
+    def __init__(self, phases=False, tasks=False):
+        self.wb = openpyxl.Workbook(write_only=True)
+        self.sheet = self.wb.create_sheet("Pi Estimation Data")
+        self.sheet.append(COLUMNS)
+        self.phase_sheet = self.wb.create_sheet("Per-Rank Phases") if phases else None
+        if self.phase_sheet is not None:
+            self.phase_sheet.append(PHASE_COLUMNS)
+        self.task_sheet = self.wb.create_sheet("Per-Rank Tasks") if tasks else None
+        if self.task_sheet is not None:
+            self.task_sheet.append(TASK_COLUMNS)
+        self.summary = MethodSummary()
+        self.rows_written = 0
+        self.phase_rows_written = 0
+        self.task_rows_written = 0
+
+    def write(self, data, phase_data=None, task_data=None):
+        for row in data.records(self.rows_written):
+            self.sheet.append(row)
+            self.summary.add(row)
+        self.rows_written = len(data)
+        if self.phase_sheet is not None and phase_data is not None:
+            for row in phase_data.records(self.phase_rows_written):
+                self.phase_sheet.append(row)
+            self.phase_rows_written = len(phase_data)
+        if self.task_sheet is not None and task_data is not None:
+            for row in task_data.records(self.task_rows_written):
+                self.task_sheet.append(row)
+            self.task_rows_written = len(task_data)
+
+    def save(self, filename):
+        write_summary_sheet(self.wb, self.summary)
+        return save_excel(self.wb, filename)
+
+
 def save_excel(wb, filename):
     try:
         if os.path.exists(filename):
@@ -0,0 +1,114 @@
+import os
+import csv
+import glob
+import importlib.util
+import numpy as np
+from src.results.results import ResultsTable, COLUMNS, TEXT_COLUMNS
+
+RESULT_FORMATS = ("xlsx", "csv", "npz", "parquet")
+# When a run was saved in several formats, the loader reads the cheapest one.
+LOAD_ORDER = ("npz", "parquet", "csv")
+
+
+def parquet_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def write_csv(data, base, run):
+    # Rows are appended, so several runs can share one file; the Run column tells them apart.
+    filename = f"{base}.csv"
+    new_file = not os.path.exists(filename)
+    with open(filename, "a", newline="") as file:
+        writer = csv.writer(file)
+        if new_file:
+            writer.writerow(["Run", *data.columns])
+        writer.writerows([run, *("" if value is None else value for value in row)] for row in data.records())
+    return filename
+
+
+def write_npz(data, base, run):
+    filename = f"{base}.npz"
+    np.savez(filename, Run=np.full(len(data), run), **{column: data[column] for column in data.columns})
+    return filename
+
+
+def write_parquet(data, base, run):
+    import pyarrow
+    import pyarrow.parquet
+
+    filename = f"{base}.parquet"
+    table = pyarrow.table({"Run": np.full(len(data), run), **{column: data[column] for column in data.columns}})
+    pyarrow.parquet.write_table(table, filename)
+    return filename
+
+
+def read_npz(filename, columns):
+    # An npz file only decompresses the members that are read, so unused columns cost nothing.
+    with np.load(filename) as file:
+        return {column: file[column] for column in columns if column in file.files}
+
+
+def read_parquet(filename, columns):
+    import pyarrow.parquet
+
+    names = pyarrow.parquet.read_schema(filename).names
+    table = pyarrow.parquet.read_table(filename, columns=[column for column in columns if column in names],
+                                       memory_map=True)
+    return {column: table.column(column).to_numpy() for column in table.column_names}
+
+
+def read_csv(filename, columns):
+    with open(filename, newline="") as file:
+        reader = csv.reader(file)
+        wanted = [(i, column) for i, column in enumerate(next(reader)) if column in columns]
+        values = {column: [] for _, column in wanted}
+        for row in reader:
+            for i, column in wanted:
+                values[column].append(row[i])
+    return {column: np.array(column_values) if column in TEXT_COLUMNS
+            else np.array([float(value) if value else np.nan for value in column_values])
+            for column, column_values in values.items()}
+
+
+RESULT_WRITERS = {
+    "csv": write_csv,
+    "npz": write_npz,
+    "parquet": write_parquet,
+}
+RESULT_READERS = {
+    "npz": read_npz,
+    "parquet": read_parquet,
+    "csv": read_csv,
+}
+
+
+def find_runs(directory, pattern="pi_estimation_data_*"):
+    formats = [result_format for result_format in LOAD_ORDER if result_format != "parquet" or parquet_available()]
+    runs = {}
+    for filename in sorted(glob.glob(os.path.join(directory, f"{pattern}.*"))):
+        stem, extension = os.path.splitext(os.path.basename(filename))
+        result_format = extension[1:]
+        if stem.endswith(("_phases", "_tasks")) or result_format not in formats:
+            continue
+        if stem not in runs or formats.index(result_format) < formats.index(runs[stem][1]):
+            runs[stem] = filename, result_format
+    return runs
+
+
+def load_runs(directory, columns=COLUMNS):
+    # Reads only the requested columns of every run in the directory into one table with a Run column.
+    columns = ["Run", *(column for column in columns if column != "Run")]
+    parts = []
+    for stem, (filename, result_format) in find_runs(directory).items():
+        values = RESULT_READERS[result_format](filename, columns)
+        if values:
+            rows = len(next(iter(values.values())))
+            values.setdefault("Run", np.full(rows, stem))
+            parts.append((rows, values))
+
+    table_columns = {}
+    for column in columns:
+        missing = "" if column in TEXT_COLUMNS else np.nan
+        table_columns[column] = np.concatenate([values[column] if column in values else np.full(rows, missing)
+                                                for rows, values in parts]) if parts else np.empty(0)
+    return ResultsTable.from_columns(table_columns)
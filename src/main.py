@@ -1,133 +1,460 @@
-import sys
 import time
+# Startup is timed from here, so it covers the imports below and main()'s setup up to the first iteration.
+module_start_time = time.perf_counter()
+import sys
 import os
-import logging
+import argparse
+import subprocess
 from colorama import init
-from mpi4py import MPI
 
 project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(project_dir)
 
-from utils.utils import generate_timestamp, logger, check_folder
-from estimation.estimation import estimate_pi_send_receive, estimate_pi_reduce
-from excel.excel import create_excel_sheet, save_excel, write_to_excel
-from plot.plot import plot_pi_estimate, plot_pi_difference, plot_time_taken
+from utils.utils import (generate_timestamp, logger, check_folder, setup_logging, gather_logs, positive_int,
+                         non_negative_int)
+from backend.backend import world_communicator, run_local, is_local, BACKENDS, MAX
+from estimation.estimation import (make_dart_thrower, make_estimator, spawn_seed_sequence, resolve_methods,
+                                   DART_KERNELS, DART_CHUNK_SIZE, BIT_GENERATORS, ESTIMATION_METHODS, METHOD_GROUPS,
+                                   SWEEP_MODES, SAMPLERS, MPI_ONLY_METHODS, enable_phase_timing, take_phase_times,
+                                   random_state, restore_random_state, sweep_state, restore_sweep_state)
+from results.results import build_row, phase_statistics, ResultsTable, PHASE_COLUMNS, TASK_COLUMNS
+from benchmark.timing import measure, time_statistics
+from sweep.sweep import plan_next_batch, target_standard_error, TimeBudgetScheduler
+from checkpoint.checkpoint import save_checkpoint, load_checkpoint, CheckpointTimer, CHECKPOINT_FILE
 
 os.environ["XDG_SESSION_TYPE"] = "xcb"
 init()
 
-logging.basicConfig(filename='../app.log', level=logging.DEBUG,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
 
-
-def main(method_sel=None, max_darts=None, dart_step=None, duration=None, debug_mode=True):
-    comm = MPI.COMM_WORLD
+def main(method_sel=None, max_darts=None, dart_step=None, duration=None, debug_mode=True, kernel="numpy",
+         chunk_size=DART_CHUNK_SIZE, seed=None, bit_generator="pcg64dxsm",
+         collective="reduce", tasks_per_rank=16, sweep="independent", target_error=None, confidence=0.95,
+         samplers=("uniform",), warmup=0, trials=1, profile_phases=False,
+         output=None, batch=False, threads_per_rank=1, excel_mode="standard",
+         formats=("xlsx",), view=True, log_per_rank=False, checkpoint_interval=None,
+         checkpoint_file=CHECKPOINT_FILE, resume=False, comm=None):
+    comm = comm if comm is not None else world_communicator()
     rank = comm.rank
     size = comm.size
+    setup_logging(rank, per_rank=log_per_rank)
+
+    methods = resolve_methods(method_sel)
+    if is_local(comm):
+        skipped = [method for method in methods if method in MPI_ONLY_METHODS]
+        methods = [method for method in methods if method not in MPI_ONLY_METHODS]
+        if skipped and rank == 0:
+            logger(f"The local backend cannot run: {', '.join(skipped)}", level="warning")
+        if not methods:
+            return
+
+    settings = dict(methods=list(methods), samplers=list(samplers), size=size, threads_per_rank=threads_per_rank,
+                    sweep=sweep, kernel=kernel, bit_generator=bit_generator)
+    checkpoint = resumed = None
+    if resume:
+        # Rank 0 reads the checkpoint; the other ranks only receive the sweep position and their random streams.
+        reason = None
+        if rank == 0:
+            checkpoint, reason = load_checkpoint(checkpoint_file, settings)
+            if checkpoint:
+                resumed = {key: checkpoint[key] for key in ("seed", "rank_states", "num_iterations",
+                                                            "num_darts_per_process", "elapsed", "finished")}
+        reason, resumed = comm.bcast((reason, resumed), root=0)
+        if reason:
+            if rank == 0:
+                logger(f"Cannot resume: {reason}", level="error")
+            sys.exit(1)
+        seed = resumed["seed"]
+
+    seed, seed_sequence = spawn_seed_sequence(seed, comm)
+    if rank == 0:
+        logger(f"Random streams are seeded with: {seed} ({bit_generator})")
+    dart_throwers = {sampler: make_dart_thrower(kernel, seed_sequence, bit_generator, chunk_size, sampler, rank, size,
+                                                threads_per_rank)
+                     for sampler in samplers}
+
+    method_options = {
+        "reduce_buffer": {"collective": collective},
+        "pipelined": {"collective": collective},
+        "dynamic": {"tasks_per_rank": tasks_per_rank},
+    }
+
+    def build_estimators():
+        return {(method, sampler): make_estimator(method, comm, dart_thrower, sweep, **method_options.get(method, {}))
+                for method in methods for sampler, dart_thrower in dart_throwers.items()}
+
+    estimators = build_estimators()
+    if rank == 0 and "dynamic" in methods and "stratified" in samplers:
+        logger("The stratified sampler assumes every rank throws the same number of darts, "
+               "which the dynamic method does not guarantee", level="warning")
+
+    if rank == 0 and sweep == "incremental" and trials > 1:
+        logger("In an incremental sweep only the first trial of an iteration throws new darts", level="warning")
+
+    startup_time = comm.reduce(time.perf_counter() - module_start_time, op=MAX, root=0)
+    if rank == 0:
+        logger(f"Slowest rank started up in {startup_time:.3f} s")
 
-    wb, sheet = create_excel_sheet()
+    num_darts_per_process = dart_step if dart_step else 2500
+    if warmup:
+        # Warmup runs on separate estimators so no pipelined request or running total leaks into the sweep.
+        for estimate_pi in build_estimators().values():
+            for _ in range(warmup):
+                estimate_pi(num_darts_per_process)
+            if hasattr(estimate_pi, "flush"):
+                estimate_pi.flush()
+            if hasattr(estimate_pi, "close"):
+                estimate_pi.close()
+
+    if profile_phases:
+        enable_phase_timing()
 
     start_time = time.time()
     num_iterations = 0
-    num_darts_per_process = dart_step if dart_step else 2500
-    data = []
-
-    while True:
-        pi_estimate_send_receive = None
-        pi_estimate_reduce = None
-
-        method_start_time = time.time()
-
-        if method_sel == "both":
-            pi_estimate_send_receive = estimate_pi_send_receive(num_darts_per_process, comm)
-            send_receive_time = time.time() - method_start_time
-
-            method_start_time = time.time()
-
-            pi_estimate_reduce = estimate_pi_reduce(num_darts_per_process, comm)
-            reduce_time = time.time() - method_start_time
-        elif method_sel == "send_receive":
-            pi_estimate_send_receive = estimate_pi_send_receive(num_darts_per_process, comm)
-            send_receive_time = time.time() - method_start_time
-        elif method_sel == "reduce":
-            pi_estimate_reduce = estimate_pi_reduce(num_darts_per_process, comm)
-            reduce_time = time.time() - method_start_time
-
-        if pi_estimate_send_receive is not None:
-            data.append([num_iterations, pi_estimate_send_receive, send_receive_time, num_darts_per_process * size,
-                         num_darts_per_process, "send_receive"])
-        if pi_estimate_reduce is not None:
-            data.append([num_iterations, pi_estimate_reduce, reduce_time, num_darts_per_process * size,
-                         num_darts_per_process, "reduce"])
-
+    finished = False
+    iteration_rows = []
+    # The Iteration of every estimator's latest row; a flushed pipelined batch is only added when it is newer.
+    written_iterations = {}
+    data = ResultsTable()
+    phase_data = ResultsTable(PHASE_COLUMNS)
+    task_data = ResultsTable(TASK_COLUMNS)
+    budget = TimeBudgetScheduler(duration, start_time, sweep == "incremental") if duration else None
+    checkpoint_timer = CheckpointTimer(checkpoint_interval)
+
+    if resumed:
+        # The random streams are restored after the warmup, which draws from the same streams.
+        random_states, sweep_states = resumed["rank_states"][rank]
+        for sampler, dart_thrower in dart_throwers.items():
+            restore_random_state(dart_thrower, random_states[sampler])
+        for key, estimate_pi in estimators.items():
+            restore_sweep_state(estimate_pi, sweep_states[key])
+        num_iterations = resumed["num_iterations"]
+        num_darts_per_process = resumed["num_darts_per_process"]
+        finished = resumed["finished"]
+        start_time -= resumed["elapsed"]
+        if budget:
+            budget.start_time = start_time
+        if rank == 0:
+            data, phase_data, task_data = checkpoint["data"], checkpoint["phase_data"], checkpoint["task_data"]
+            # A finished sweep skips the loop, so the budget slack goes to the rows of the checkpointed iteration.
+            iteration_rows = checkpoint["iteration_rows"]
+            if budget and checkpoint["budget"]:
+                budget.seconds_per_dart, budget.darts_per_process = checkpoint["budget"]
+            logger(f"Resumed from {checkpoint_file} at iteration {num_iterations} "
+                   f"with {num_darts_per_process} darts per process")
+        checkpoint = None
+
+    def flush_estimators():
+        for (method, sampler), estimate_pi in estimators.items():
+            if hasattr(estimate_pi, "flush"):
+                stats = {"Sampler": sampler, "Startup Time (s)": startup_time}
+                pi_estimate = estimate_pi.flush(stats)
+                if pi_estimate is not None and stats["Iteration"] != written_iterations.get((method, sampler)):
+                    written_iterations[method, sampler] = stats["Iteration"]
+                    # A flushed batch was never timed as a trial, so rank 0's own compute and wait stand in.
+                    data.append(build_row(None, pi_estimate, stats["Batch Time (s)"], None, None, method, stats,
+                                          confidence))
+
+    def write_checkpoint():
+        # Reductions still in flight are completed first, so the checkpoint holds every batch thrown so far.
+        flush_estimators()
+        random_states = {sampler: random_state(dart_thrower) for sampler, dart_thrower in dart_throwers.items()}
+        sweep_states = {key: sweep_state(estimate_pi) for key, estimate_pi in estimators.items()}
+        rank_states = comm.gather((random_states, sweep_states), root=0)
+        if rank == 0:
+            save_checkpoint(checkpoint_file, {
+                "settings": settings,
+                "seed": seed,
+                "rank_states": rank_states,
+                "num_iterations": num_iterations,
+                "num_darts_per_process": num_darts_per_process,
+                "elapsed": time.time() - start_time,
+                "budget": (budget.seconds_per_dart, budget.darts_per_process) if budget else None,
+                "finished": finished,
+                "data": data,
+                "phase_data": phase_data,
+                "task_data": task_data,
+                "iteration_rows": iteration_rows,
+            })
+            logger(f"Checkpoint of iteration {num_iterations} saved at: {checkpoint_file}", level="debug")
+        checkpoint_timer.reset()
+
+    stream = None
+    if rank == 0 and excel_mode == "streaming" and "xlsx" in formats:
+        from excel.excel import ExcelStream
+        stream = ExcelStream(phases=profile_phases, tasks="dynamic" in methods)
+
+    while not finished:
+        if stream:
+            # Rows of finished iterations no longer change, so they go out before the next iteration runs.
+            stream.write(data, phase_data, task_data)
+        iteration_start_time = time.time()
+        iteration_rows = []
+        rows_by_estimator = {}
+        phase_times = []
+        for (method, sampler), estimate_pi in estimators.items():
+            times = []
+            for _ in range(trials):
+                stats = {"Sampler": sampler, "Iteration": num_iterations, "Startup Time (s)": startup_time}
+                pi_estimate, time_taken = measure(comm, estimate_pi, num_darts_per_process, stats=stats)
+                times.append(time_taken)
+            if profile_phases:
+                phase_times.append([seconds / trials for seconds in take_phase_times()])
+
+            if pi_estimate is not None:
+                stats.update(time_statistics(times))
+                row = data.append(build_row(num_iterations, pi_estimate, sum(times) / len(times),
+                                            num_darts_per_process * size, num_darts_per_process, method, stats,
+                                            confidence))
+                iteration_rows.append(row)
+                rows_by_estimator[method, sampler] = row
+                written_iterations[method, sampler] = stats["Iteration"]
+                for r, rank_tasks in enumerate(stats.get("Per-Rank Tasks", ())):
+                    task_data.append([num_iterations, method, sampler, r, *rank_tasks])
+
+        if profile_phases:
+            # One gather per iteration carries every rank's phase times for all methods.
+            per_rank_phase_times = comm.gather(phase_times, root=0)
+            if rank == 0:
+                for i, (method, sampler) in enumerate(estimators):
+                    per_rank = [times[i] for times in per_rank_phase_times]
+                    for r in range(size):
+                        phase_data.append([num_iterations, method, sampler, r, *per_rank[r]])
+                    row = rows_by_estimator.get((method, sampler))
+                    if row is not None:
+                        for column, value in phase_statistics(per_rank).items():
+                            data.set(row, column, value)
+
+        logger("Iteration %d finished on rank %d with %d darts per process", num_iterations, rank,
+               num_darts_per_process, level="debug")
         num_iterations += 1
-
-        if max_darts and num_darts_per_process * size >= max_darts:
-            break
-
-        num_darts_per_process += dart_step if dart_step else 2500
-
-        if duration and (time.time() - start_time) >= duration:
-            break
+        if budget:
+            budget.record(num_darts_per_process, time.time() - iteration_start_time)
+
+        # Rank 0 takes every stop decision and broadcasts it, so no rank leaves the loop on its own clock.
+        decision = None
+        if rank == 0:
+            target_met = False
+            next_darts_per_process = num_darts_per_process + (dart_step if dart_step else 2500)
+            if target_error:
+                target_met, next_darts_per_process = plan_next_batch(data, iteration_rows, target_error,
+                                                                     num_darts_per_process,
+                                                                     dart_step if dart_step else 2500, size)
+            stop = target_met or bool(max_darts and num_darts_per_process * size >= max_darts)
+            if budget and not stop:
+                stop, next_darts_per_process = budget.plan(num_darts_per_process, next_darts_per_process)
+            decision = target_met, stop, next_darts_per_process, checkpoint_timer.due()
+        target_met, stop, next_darts_per_process, checkpoint_due = comm.bcast(decision, root=0)
+
+        if target_met and rank == 0:
+            data.set(iteration_rows, "Darts To Target", data["Num Darts"][iteration_rows])
+            logger(f"Target standard error {target_error} reached after {num_iterations} iterations "
+                   f"with {num_darts_per_process * size} darts")
+
+        finished = stop
+        if not stop:
+            num_darts_per_process = next_darts_per_process
+        # A finished sweep is checkpointed too, so a run that dies while writing its output can still be resumed.
+        if checkpoint_interval and (checkpoint_due or finished):
+            write_checkpoint()
+
+    if budget and rank == 0:
+        slack = budget.slack()
+        data.set(iteration_rows, "Budget Slack (s)", slack)
+        if slack >= 0:
+            logger(f"Sweep finished {slack:.3f} s before its {duration} s budget")
+        else:
+            logger(f"Sweep overshot its {duration} s budget by {-slack:.3f} s", level="warning")
+
+    flush_estimators()
+    for estimate_pi in estimators.values():
+        if hasattr(estimate_pi, "close"):
+            estimate_pi.close()
+    for dart_thrower in dart_throwers.values():
+        if hasattr(dart_thrower, "close"):
+            dart_thrower.close()
+
+    # The sweep is over, so collecting the other ranks' log lines on rank 0 no longer costs iteration time.
+    gather_logs(comm)
 
     if rank == 0:
-        write_to_excel(sheet, data)
+        # Only the output rank pays for importing the reporting stack and building the workbook.
+        check_folder()
+        from excel.excel import (create_excel_sheet, save_excel, write_to_excel, write_phase_sheet,
+                                 write_task_sheet, write_summary_sheet, summarize)
+        from excel.writers import RESULT_WRITERS, parquet_available
+        from plot.plot import (plot_pi_estimate, plot_pi_difference, plot_time_taken, plot_phase_breakdown,
+                               render_plots, split_series, split_phases)
+
+        if stream:
+            stream.write(data, phase_data, task_data)
+        elif "xlsx" in formats:
+            wb, sheet = create_excel_sheet()
+            write_to_excel(sheet, data)
+            if profile_phases:
+                write_phase_sheet(wb, phase_data)
+            if len(task_data):
+                write_task_sheet(wb, task_data)
+            write_summary_sheet(wb, summarize(data))
 
         timestamp = generate_timestamp()
         excel_dir = os.path.join(".", "excel")
         estimation_dir = os.path.join(".", "png", "estimation")
         difference_dir = os.path.join(".", "png", "pi_difference")
         runtime_dir = os.path.join(".", "png", "runtime")
+        phases_dir = os.path.join(".", "png", "phases")
 
         os.makedirs(excel_dir, exist_ok=True)
         os.makedirs(estimation_dir, exist_ok=True)
         os.makedirs(difference_dir, exist_ok=True)
         os.makedirs(runtime_dir, exist_ok=True)
+        if profile_phases:
+            os.makedirs(phases_dir, exist_ok=True)
 
-        filename_excel = os.path.join(excel_dir, f"pi_estimation_data_{timestamp}.xlsx")
+        filename_excel = output or os.path.join(excel_dir, f"pi_estimation_data_{timestamp}.xlsx")
+        os.makedirs(os.path.dirname(os.path.abspath(filename_excel)), exist_ok=True)
         filename_pi_estimate = os.path.join(estimation_dir, f"pi_estimate_plot_{timestamp}.png")
         filename_pi_difference = os.path.join(difference_dir, f"pi_difference_plot_{timestamp}.png")
         filename_time_taken = os.path.join(runtime_dir, f"time_taken_plot_{timestamp}.png")
+        filename_phases = os.path.join(phases_dir, f"phase_breakdown_plot_{timestamp}.png")
 
         try:
-            save_excel(wb, filename_excel)
-            logger(f"Excel file saved successfully at: {filename_excel}")
-
-            plot_pi_estimate(data, filename_pi_estimate, method_sel)
-            logger(f"Estimation_pi graph successfully saved at: {filename_pi_estimate}")
-
-            plot_pi_difference(data, filename_pi_difference, method_sel)
-            logger(f"Pi Difference graph successfully saved at: {filename_pi_difference}")
-
-            plot_time_taken(data, filename_time_taken, method_sel)
-            logger(f"Runtime graph successfully saved at: {filename_time_taken}")
+            if stream:
+                stream.save(filename_excel)
+                logger(f"Excel file saved successfully at: {filename_excel}")
+            elif "xlsx" in formats:
+                save_excel(wb, filename_excel)
+                logger(f"Excel file saved successfully at: {filename_excel}")
+
+            # The other formats sit next to the Excel file under the same name.
+            base = os.path.splitext(filename_excel)[0]
+            for result_format in formats:
+                if result_format not in RESULT_WRITERS:
+                    continue
+                if result_format == "parquet" and not parquet_available():
+                    logger("Parquet output needs pyarrow; skipping it", level="warning")
+                    continue
+                filename = RESULT_WRITERS[result_format](data, base, timestamp)
+                if profile_phases:
+                    RESULT_WRITERS[result_format](phase_data, f"{base}_phases", timestamp)
+                if len(task_data):
+                    RESULT_WRITERS[result_format](task_data, f"{base}_tasks", timestamp)
+                logger(f"{result_format.upper()} results saved successfully at: {filename}")
+
+            if not batch:
+                # The results are on disk by now; the figures render concurrently from one split of the data.
+                series = split_series(data)
+                jobs = [(plot_pi_estimate, series, filename_pi_estimate),
+                        (plot_pi_difference, series, filename_pi_difference),
+                        (plot_time_taken, series, filename_time_taken)]
+                if profile_phases:
+                    jobs.append((plot_phase_breakdown, split_phases(phase_data), filename_phases))
+                for filename in render_plots(jobs):
+                    if filename:
+                        logger(f"Graph successfully saved at: {filename}")
 
             logger("Excel file and plots saved successfully.")
         except Exception as e:
-            logger(f"Error saving Excel file or plots: {e}", level='error')
-            logging.exception("Error occurred while saving Excel file or plots.")
-
-        os.system(f"libreoffice --calc {filename_excel}")
+            logger(f"Error saving Excel file or plots: {e}", level='error', exc_info=True)
+
+        if view and not batch and "xlsx" in formats:
+            # The viewer runs in its own session, so rank 0 and with it the MPI job end without waiting for it.
+            try:
+                subprocess.Popen(["libreoffice", "--calc", filename_excel], start_new_session=True,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            except FileNotFoundError:
+                logger("LibreOffice is not installed; the Excel file is not opened", level="warning")
         sys.exit()
 
 
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        usage="python3 main.py [method] [max_darts] [dart_step] [duration] [debug_mode] [options]")
+    parser.add_argument("method", nargs="?", default="both", choices=[*ESTIMATION_METHODS, *METHOD_GROUPS],
+                        help="estimation method or group of methods; pipelined reports every batch one call late, "
+                             "so with --trials above 1 a row holds the estimate of the iteration's second to last "
+                             "trial and the other trials' batches are only timed"),
+    parser.add_argument("max_darts", nargs="?")
+    parser.add_argument("dart_step", nargs="?")
+    parser.add_argument("duration", nargs="?")
+    parser.add_argument("debug_mode", nargs="?")
+    parser.add_argument("--kernel", choices=DART_KERNELS, default="numpy",
+                        help="dart throwing kernel used by every rank")
+    parser.add_argument("--chunk-size", type=positive_int, default=DART_CHUNK_SIZE,
+                        help="darts generated per chunk by the numpy kernel; bounds the scratch memory per rank")
+    parser.add_argument("--seed", type=non_negative_int, default=None,
+                        help="root seed broadcast by rank 0; every rank spawns an independent stream from it")
+    parser.add_argument("--bit-generator", choices=BIT_GENERATORS, default="pcg64dxsm",
+                        help="numpy bit generator behind every rank's stream")
+    parser.add_argument("--collective", choices=["reduce", "allreduce"], default="reduce",
+                        help="buffer collective used by the reduce_buffer and pipelined methods")
+    parser.add_argument("--tasks-per-rank", type=int, default=16,
+                        help="tasks the dynamic method splits each rank's share of the dart budget into")
+    parser.add_argument("--sweep", choices=SWEEP_MODES, default="independent",
+                        help="independent throws fresh darts every iteration; incremental only adds dart_step "
+                             "darts per rank and reports the cumulative estimate")
+    parser.add_argument("--target-error", type=float, default=None,
+                        help="stop once the standard error of every method's estimate is at most this value")
+    parser.add_argument("--target-ci", type=float, default=None,
+                        help="stop once every method's confidence interval is at most this wide")
+    parser.add_argument("--confidence", type=float, default=0.95,
+                        help="confidence level of the recorded intervals and of --target-ci")
+    parser.add_argument("--warmup", type=int, default=0,
+                        help="untimed runs of every method before the sweep starts")
+    parser.add_argument("--trials", type=positive_int, default=1,
+                        help="timed repetitions of every method per iteration; rows record their mean, median "
+                             "and standard deviation")
+    parser.add_argument("--sampler", nargs="+", choices=SAMPLERS, default=["uniform"],
+                        help="dart sampling strategies; every method is run once per strategy")
+    parser.add_argument("--profile-phases", action="store_true",
+                        help="time dart generation, communication and idle waiting separately on every rank; "
+                             "adds a barrier before each method's communication")
+    parser.add_argument("--threads-per-rank", type=positive_int, default=1,
+                        help="threads that split every rank's darts, each with its own random stream")
+    parser.add_argument("--backend", choices=BACKENDS, default="mpi",
+                        help="mpi runs under mpirun; local starts its own processes and needs neither mpirun nor "
+                             "mpi4py, but only supports methods without RMA or nonblocking collectives")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="processes started by the local backend")
+    parser.add_argument("--output", default=None,
+                        help="path of the Excel file; defaults to a timestamped file in ./excel")
+    parser.add_argument("--excel-mode", choices=["standard", "streaming"], default="standard",
+                        help="streaming writes rows to a write-only workbook as iterations finish, which keeps "
+                             "rank 0's memory bounded on long sweeps")
+    parser.add_argument("--formats", nargs="+", choices=["xlsx", "csv", "npz", "parquet"], default=["xlsx"],
+                        help="result files to write; csv appends to an existing file and parquet needs pyarrow")
+    parser.add_argument("--no-view", action="store_true",
+                        help="do not open the Excel file in LibreOffice after the run")
+    parser.add_argument("--log-per-rank", action="store_true",
+                        help="every rank writes its own app.rank<N>.log instead of rank 0 collecting all "
+                             "messages in app.log at the end of the sweep")
+    parser.add_argument("--checkpoint-interval", type=float, default=None, metavar="SECONDS",
+                        help="save the sweep state to the checkpoint file at most this often and once the sweep "
+                             "ends")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="checkpoint file to write and resume from")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the sweep stored in the checkpoint file; the method, samplers, kernel, "
+                             "bit generator, sweep mode, ranks and threads per rank must match")
+    parser.add_argument("--batch", action="store_true",
+                        help="only write the Excel file; skip the plots and the LibreOffice viewer")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
     logger("Program has been started")
 
     if len(sys.argv) < 2:
         logger("FATAL ERROR; wrong usage: python3 main.py [method] [max_darts] [dart_step] [duration] [debug_mode]",
                level="error")
-        logger("[method] should be 'send_receive', 'reduce', or 'both'", level='error')
+        logger(f"[method] should be one of: {', '.join([*ESTIMATION_METHODS, *METHOD_GROUPS])}", level='error')
         logger("[debug_mode] should be 'True' or 'False'", level="error")
         sys.exit(1)
 
-    check_folder()
-
-    method = sys.argv[1] if len(sys.argv) > 1 else "both"
-    max_darts = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else None
-    dart_step = int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3].isdigit() else 2500
-    duration = int(sys.argv[4]) if len(sys.argv) > 4 and sys.argv[4].isdigit() else 30
-    debug_mode = sys.argv[5].lower() == 'true' if len(sys.argv) > 5 else 'True'
+    args = parse_arguments()
+    method = args.method
+    max_darts = int(args.max_darts) if args.max_darts and args.max_darts.isdigit() else None
+    dart_step = int(args.dart_step) if args.dart_step and args.dart_step.isdigit() else 2500
+    duration = int(args.duration) if args.duration and args.duration.isdigit() else 30
+    debug_mode = args.debug_mode.lower() == 'true' if args.debug_mode else 'True'
 
     if debug_mode:
         logger(f"Method is going to be used: {method}", level="debug")
@@ -135,5 +462,36 @@ if __name__ == "__main__":
         logger(f"The amount of darts is getting in steps: {dart_step}", level="debug")
         logger(f"The duration of the program is going to be: {duration} seconds", level="debug")
         logger(f"Debug Mode is {debug_mode}", level="debug")
-
-    main(method, max_darts, dart_step, duration, debug_mode)
+        logger(f"Dart kernel is going to be used: {args.kernel}", level="debug")
+        logger(f"Darts are going to be generated in chunks of: {args.chunk_size}", level="debug")
+        logger(f"Seed is going to be used: {args.seed}", level="debug")
+        logger(f"Bit generator is going to be used: {args.bit_generator}", level="debug")
+        logger(f"Buffer collective is going to be used: {args.collective}", level="debug")
+        logger(f"Tasks per rank for the dynamic method: {args.tasks_per_rank}", level="debug")
+        logger(f"Sweep mode is going to be used: {args.sweep}", level="debug")
+        logger(f"Target standard error: {args.target_error}, target interval width: {args.target_ci} "
+               f"at {args.confidence} confidence", level="debug")
+        logger(f"Samplers are going to be used: {', '.join(args.sampler)}", level="debug")
+        logger(f"Warmup runs: {args.warmup}, timed trials per iteration: {args.trials}", level="debug")
+        logger(f"Per-phase timing is {'on' if args.profile_phases else 'off'}", level="debug")
+        logger(f"Threads per rank: {args.threads_per_rank}", level="debug")
+        logger(f"Backend is going to be used: {args.backend}"
+               + (f" with {args.jobs} processes" if args.backend == "local" else ""), level="debug")
+        logger(f"Excel file is going to be saved at: {args.output or './excel'}, batch mode is "
+               f"{'on' if args.batch else 'off'}, Excel mode: {args.excel_mode}, "
+               f"result formats: {', '.join(args.formats)}", level="debug")
+        logger(f"Log files: {'one per rank' if args.log_per_rank else 'rank 0 only'}", level="debug")
+        logger(f"Checkpoint file: {args.checkpoint}, interval: {args.checkpoint_interval} s, "
+               f"resume is {'on' if args.resume else 'off'}", level="debug")
+
+    options = dict(kernel=args.kernel, chunk_size=args.chunk_size, seed=args.seed, bit_generator=args.bit_generator,
+                   collective=args.collective, tasks_per_rank=args.tasks_per_rank, sweep=args.sweep,
+                   target_error=target_standard_error(args.target_error, args.target_ci, args.confidence),
+                   confidence=args.confidence, samplers=args.sampler, warmup=args.warmup, trials=args.trials,
+                   profile_phases=args.profile_phases, output=args.output, batch=args.batch,
+                   threads_per_rank=args.threads_per_rank, excel_mode=args.excel_mode,
+                   formats=args.formats, view=not args.no_view, log_per_rank=args.log_per_rank,
+                   checkpoint_interval=args.checkpoint_interval, checkpoint_file=args.checkpoint, resume=args.resume)
+    if args.backend == "local":
+        sys.exit(run_local(main, args.jobs, method, max_darts, dart_step, duration, debug_mode, **options))
+    main(method, max_darts, dart_step, duration, debug_mode, **options)
@@ -1,28 +1,71 @@
+import multiprocessing
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
+from concurrent.futures import ProcessPoolExecutor
 from src.utils.utils import logger
 
-def plot_pi_estimate(data, filename, method_sel):
-    num_darts = np.array([row[3] for row in data], dtype=float)
-    pi_estimates_send_receive = np.array([row[1] if row[5] == "send_receive" else None for row in data], dtype=float)
-    pi_estimates_reduce = np.array([row[1] if row[5] == "reduce" else None for row in data], dtype=float)
+# Figures are only ever saved to files, so no GUI backend is needed, on rank 0 or in the render workers.
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+METHOD_COLORS = {"send_receive": "blue", "reduce": "red", "reduce_buffer": "green", "pipelined": "orange",
+                 "send_receive_irecv": "cyan", "send_receive_combined": "navy", "send_receive_tree": "purple",
+                 "dynamic": "brown", "hierarchical": "olive", "rma": "magenta"}
+METHOD_LABELS = {"send_receive": "Send/Receive", "reduce": "Reduce", "reduce_buffer": "Buffer Reduce",
+                 "pipelined": "Pipelined Reduce", "send_receive_irecv": "Irecv Gather",
+                 "send_receive_combined": "Combined Send/Receive", "send_receive_tree": "Tree Send/Receive",
+                 "dynamic": "Dynamic Work Sharing", "hierarchical": "Hierarchical Reduce", "rma": "RMA Accumulate"}
+
+
+SAMPLER_LINESTYLES = {"uniform": "-", "antithetic": "--", "stratified": ":", "halton": "-.",
+                      "sobol": (0, (5, 1, 1, 1))}
+PHASE_COLORS = {"Compute Time (s)": "tab:green", "Communication Time (s)": "tab:blue", "Idle Time (s)": "tab:red"}
+SERIES_COLUMNS = ("Num Darts", "Pi Estimate", "Time Taken (s)", "Time Std (s)")
+
+
+def split_series(data, columns=SERIES_COLUMNS):
+    # One pass over the results table; every plot then works on the same per-method arrays. np.interp needs
+    # increasing dart counts, and a batch cut short by the time budget can be smaller than the one before it.
+    series = {}
+    for key, rows in data.groups("Method", "Sampler").items():
+        rows = rows[np.argsort(data["Num Darts"][rows], kind="stable")]
+        series[key] = {column: data[column][rows] for column in columns}
+    return series
+
+
+def split_phases(phase_data):
+    ranks = phase_data["Rank"].astype(np.int64)
+    return {key: {phase: np.bincount(ranks[rows], weights=phase_data[phase][rows]) for phase in PHASE_COLORS}
+            for key, rows in phase_data.groups("Method", "Sampler").items()}
+
+
+def split_by_method(series, column):
+    return {key: (columns["Num Darts"], columns[column]) for key, columns in series.items()}
+
+
+def num_darts_range(series):
+    num_darts = np.concatenate([columns["Num Darts"] for columns in series.values()])
+    return np.linspace(np.nanmin(num_darts), np.nanmax(num_darts), num=500)
+
+
+def plot_method_series(series, num_darts_interp, label):
+    samplers = {sampler for _, sampler in series}
+    for (method, sampler), (num_darts, values) in series.items():
+        values_interp = np.interp(num_darts_interp, num_darts, values)
+        name = METHOD_LABELS.get(method, method)
+        if len(samplers) > 1 or sampler != "uniform":
+            name = f"{name}, {sampler.capitalize()}"
+        plt.plot(num_darts_interp, values_interp, color=METHOD_COLORS.get(method),
+                 linestyle=SAMPLER_LINESTYLES.get(sampler, '-'), label=label.format(name))
+
 
-    valid_send_receive = ~np.isnan(pi_estimates_send_receive)
-    valid_reduce = ~np.isnan(pi_estimates_reduce)
+def plot_pi_estimate(series, filename):
+    pi_estimates = split_by_method(series, "Pi Estimate")
 
-    num_darts_interp = np.linspace(num_darts.min(), num_darts.max(), num=500)
-    if method_sel in ["both", "send_receive"]:
-        pi_estimates_send_receive_interp = np.interp(num_darts_interp, num_darts[valid_send_receive],
-                                                     pi_estimates_send_receive[valid_send_receive])
-    if method_sel in ["both", "reduce"]:
-        pi_estimates_reduce_interp = np.interp(num_darts_interp, num_darts[valid_reduce], pi_estimates_reduce[valid_reduce])
+    num_darts_interp = num_darts_range(series)
 
     plt.figure(figsize=(10, 5))
-    if method_sel in ["both", "send_receive"]:
-        plt.plot(num_darts_interp, pi_estimates_send_receive_interp, color='blue', linestyle='-',
-                 label='Pi Estimate (Send/Receive)')
-    if method_sel in ["both", "reduce"]:
-        plt.plot(num_darts_interp, pi_estimates_reduce_interp, color='red', linestyle='-', label='Pi Estimate (Reduce)')
+    plot_method_series(pi_estimates, num_darts_interp, 'Pi Estimate ({})')
     plt.xlabel('Number of Darts')
     plt.ylabel('Pi Estimate')
     plt.title('Estimation of Pi')
@@ -30,31 +73,16 @@ def plot_pi_estimate(data, filename, method_sel):
     plt.grid(True)
     plt.savefig(filename)
     plt.close()
+    return filename
 
-def plot_pi_difference(data, filename, method_sel):
-    num_darts = np.array([row[3] for row in data], dtype=float)
-    pi_estimates_send_receive = np.array([row[1] if row[5] == "send_receive" else None for row in data], dtype=float)
-    pi_estimates_reduce = np.array([row[1] if row[5] == "reduce" else None for row in data], dtype=float)
+def plot_pi_difference(series, filename):
+    pi_differences = {key: (method_darts, np.abs(np.pi - pi_estimates))
+                      for key, (method_darts, pi_estimates) in split_by_method(series, "Pi Estimate").items()}
 
-    valid_send_receive = ~np.isnan(pi_estimates_send_receive)
-    valid_reduce = ~np.isnan(pi_estimates_reduce)
-
-    pi_difference_send_receive = np.abs(np.pi - pi_estimates_send_receive)
-    pi_difference_reduce = np.abs(np.pi - pi_estimates_reduce)
-
-    num_darts_interp = np.linspace(num_darts.min(), num_darts.max(), num=500)
-    if method_sel in ["both", "send_receive"]:
-        pi_difference_send_receive_interp = np.interp(num_darts_interp, num_darts[valid_send_receive],
-                                                      pi_difference_send_receive[valid_send_receive])
-    if method_sel in ["both", "reduce"]:
-        pi_difference_reduce_interp = np.interp(num_darts_interp, num_darts[valid_reduce], pi_difference_reduce[valid_reduce])
+    num_darts_interp = num_darts_range(series)
 
     plt.figure(figsize=(10, 5))
-    if method_sel in ["both", "send_receive"]:
-        plt.plot(num_darts_interp, pi_difference_send_receive_interp, color='blue', linestyle='-',
-                 label='Pi Difference (Send/Receive)')
-    if method_sel in ["both", "reduce"]:
-        plt.plot(num_darts_interp, pi_difference_reduce_interp, color='red', linestyle='-', label='Pi Difference (Reduce)')
+    plot_method_series(pi_differences, num_darts_interp, 'Pi Difference ({})')
     plt.xlabel('Number of Darts')
     plt.ylabel('Absolute Pi Difference')
     plt.title('Difference from Pi Estimate')
@@ -62,30 +90,21 @@ def plot_pi_difference(data, filename, method_sel):
     plt.grid(True)
     plt.savefig(filename)
     plt.close()
+    return filename
 
-def plot_time_taken(data, filename, method_sel):
+def plot_time_taken(series, filename):
     try:
-        num_darts = np.array([row[3] for row in data], dtype=float)
-        time_taken_send_receive = np.array([row[2] if row[5] == "send_receive" else None for row in data], dtype=float)
-        time_taken_reduce = np.array([row[2] if row[5] == "reduce" else None for row in data], dtype=float)
+        time_taken = split_by_method(series, "Time Taken (s)")
+        time_std = split_by_method(series, "Time Std (s)")
 
-        valid_send_receive = ~np.isnan(time_taken_send_receive)
-        valid_reduce = ~np.isnan(time_taken_reduce)
-
-        num_darts_interp = np.linspace(num_darts.min(), num_darts.max(), num=500)
-        if method_sel in ["both", "send_receive"]:
-            time_taken_send_receive_interp = np.interp(num_darts_interp, num_darts[valid_send_receive],
-                                                       time_taken_send_receive[valid_send_receive])
-        if method_sel in ["both", "reduce"]:
-            time_taken_reduce_interp = np.interp(num_darts_interp, num_darts[valid_reduce], time_taken_reduce[valid_reduce])
+        num_darts_interp = num_darts_range(series)
 
         plt.figure(figsize=(10, 5))
-        if method_sel in ["both", "send_receive"]:
-            plt.plot(num_darts_interp, time_taken_send_receive_interp, color='blue', linestyle='-',
-                     label='Time Taken (Send/Receive) (s)')
-        if method_sel in ["both", "reduce"]:
-            plt.plot(num_darts_interp, time_taken_reduce_interp, color='red', linestyle='-',
-                     label='Time Taken (Reduce) (s)')
+        plot_method_series(time_taken, num_darts_interp, 'Time Taken ({}) (s)')
+        for key, (method_darts, times) in time_taken.items():
+            if np.any(time_std[key][1] > 0):
+                plt.errorbar(method_darts, times, yerr=time_std[key][1], fmt='none',
+                             ecolor=METHOD_COLORS.get(key[0]), alpha=0.5, capsize=3)
         plt.xlabel('Number of Darts')
         plt.ylabel('Time Taken (s)')
         plt.title('Time Taken for Estimation')
@@ -93,5 +112,78 @@ def plot_time_taken(data, filename, method_sel):
         plt.grid(True)
         plt.savefig(filename)
         plt.close()
+        return filename
     except Exception as e:
         logger(f"Error saving time taken plot: {e}", level='error')
+
+
+def plot_phase_breakdown(totals, filename):
+    try:
+        columns = min(3, len(totals))
+        rows = -(-len(totals) // columns)
+        fig, axes = plt.subplots(rows, columns, figsize=(5 * columns, 4 * rows), squeeze=False)
+        for ax, ((method, sampler), per_rank) in zip(axes.flat, totals.items()):
+            bottom = np.zeros(max(len(seconds) for seconds in per_rank.values()))
+            for phase, color in PHASE_COLORS.items():
+                seconds = np.pad(per_rank[phase], (0, len(bottom) - len(per_rank[phase])))
+                ax.bar(np.arange(len(bottom)), seconds, bottom=bottom, color=color, label=phase.replace(" (s)", ""))
+                bottom += seconds
+            name = METHOD_LABELS.get(method, method)
+            ax.set_title(name if sampler == "uniform" else f"{name}, {sampler.capitalize()}")
+            ax.set_xlabel('Rank')
+            ax.set_ylabel('Time (s)')
+            ax.set_xticks(np.arange(len(bottom)))
+        for ax in axes.flat[len(totals):]:
+            ax.set_visible(False)
+        axes.flat[0].legend()
+        fig.suptitle('Time per Phase and Rank')
+        fig.tight_layout(rect=(0, 0, 1, 0.97))
+        fig.savefig(filename)
+        plt.close(fig)
+        return filename
+    except Exception as e:
+        logger(f"Error saving phase breakdown plot: {e}", level='error')
+
+
+def render_plots(jobs):
+    # Every (plot function, data, filename) job renders in its own worker. The workers are forked: a spawned
+    # worker would re-import main.py, and with it mpi4py, which would try to join the MPI job.
+    with ProcessPoolExecutor(max_workers=len(jobs), mp_context=multiprocessing.get_context("fork")) as executor:
+        futures = [executor.submit(function, *args) for function, *args in jobs]
+        return [future.result() for future in futures]
+
+
+def plot_scaling(results, filename):
+    try:
+        fig, (speedup_ax, efficiency_ax) = plt.subplots(1, 2, figsize=(12, 5))
+        series = {}
+        for result in results:
+            series.setdefault((result["Mode"], result["Method"], result["Series"]), []).append(result)
+
+        ranks = sorted({result["Ranks"] for result in results})
+        speedup_ax.plot(ranks, np.array(ranks) / ranks[0], color="gray", linestyle=":", label="Ideal")
+        efficiency_ax.axhline(1.0, color="gray", linestyle=":", label="Ideal")
+        for (mode, method, total_darts), runs in series.items():
+            runs = sorted(runs, key=lambda result: result["Ranks"])
+            x = [result["Ranks"] for result in runs]
+            label = f"{METHOD_LABELS.get(method, method)}, {mode} ({total_darts:,} darts)"
+            style = dict(color=METHOD_COLORS.get(method), linestyle="-" if mode == "strong" else "--", marker="o")
+            if mode == "strong":
+                speedup_ax.plot(x, [result["Speedup"] for result in runs], label=label, **style)
+            efficiency_ax.plot(x, [result["Efficiency"] for result in runs], label=label, **style)
+
+        speedup_ax.set_xlabel('Ranks')
+        speedup_ax.set_ylabel('Speedup')
+        speedup_ax.set_title('Strong Scaling Speedup')
+        efficiency_ax.set_xlabel('Ranks')
+        efficiency_ax.set_ylabel('Parallel Efficiency')
+        efficiency_ax.set_title('Parallel Efficiency')
+        for ax in (speedup_ax, efficiency_ax):
+            ax.set_xticks(ranks)
+            ax.grid(True)
+            ax.legend(fontsize='small')
+        fig.tight_layout()
+        fig.savefig(filename)
+        plt.close(fig)
+    except Exception as e:
+        logger(f"Error saving scaling plot: {e}", level='error')
@@ -0,0 +1,145 @@
+import math
+import numpy as np
+from statistics import NormalDist
+
+COLUMNS = ["Iteration", "Pi Estimate", "Time Taken (s)", "Num Darts", "Dart Step", "Method", "Sampler",
+           "Time Median (s)", "Time Std (s)", "Trials",
+           "Overlap Time (s)", "Wait Time (s)", "Batch Time (s)",
+           "Min Tasks", "Max Tasks", "Min Throughput (darts/s)", "Max Throughput (darts/s)",
+           "Nodes", "Intra-node Time (s)", "Inter-node Time (s)",
+           "Compute Time (s)", "Communication Time (s)", "Idle Time (s)", "Compute Imbalance",
+           "Std Error", "CI Low", "CI High", "Darts To Target", "Budget Slack (s)",
+           "Startup Time (s)"]
+
+PHASE_COLUMNS = ["Iteration", "Method", "Sampler", "Rank", "Compute Time (s)", "Communication Time (s)",
+                 "Idle Time (s)"]
+# One row per rank and iteration of the dynamic method, so load imbalance can be traced to a rank.
+TASK_COLUMNS = ["Iteration", "Method", "Sampler", "Rank", "Tasks", "Darts", "Throughput (darts/s)"]
+SUMMARY_COLUMNS = ["Method", "Sampler", "Rows", "Final Num Darts", "Final Pi Estimate", "Final Std Error",
+                   "Mean Time Taken (s)", "Min Time Taken (s)", "Max Time Taken (s)", "Mean Abs Error"]
+TEXT_COLUMNS = {"Method": "U32", "Sampler": "U16", "Run": "U64"}
+INTEGER_COLUMNS = {"Iteration", "Num Darts", "Dart Step", "Trials", "Min Tasks", "Max Tasks", "Nodes",
+                   "Darts To Target", "Rank", "Tasks", "Darts"}
+
+
+def confidence_z(confidence=0.95):
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def standard_error(pi_estimate, num_darts):
+    hit_fraction = pi_estimate / 4
+    return 4 * math.sqrt(hit_fraction * (1 - hit_fraction) / num_darts)
+
+
+def build_row(iteration, pi_estimate, time_taken, num_darts, dart_step, method, stats=None, confidence=0.95):
+    values = {
+        "Iteration": iteration,
+        "Pi Estimate": pi_estimate,
+        "Time Taken (s)": time_taken,
+        "Num Darts": num_darts,
+        "Dart Step": dart_step,
+        "Method": method,
+    }
+    values.update(stats or {})
+    if values["Pi Estimate"] is not None and values["Num Darts"]:
+        error = standard_error(values["Pi Estimate"], values["Num Darts"])
+        half_width = confidence_z(confidence) * error
+        values["Std Error"] = error
+        values["CI Low"] = values["Pi Estimate"] - half_width
+        values["CI High"] = values["Pi Estimate"] + half_width
+    return [values.get(column) for column in COLUMNS]
+
+
+def phase_statistics(per_rank_times):
+    # per_rank_times holds one [compute, communication, idle] triple per rank.
+    compute, communication, idle = (sum(phase) / len(phase) for phase in zip(*per_rank_times))
+    slowest = max(times[0] for times in per_rank_times)
+    return {
+        "Compute Time (s)": compute,
+        "Communication Time (s)": communication,
+        "Idle Time (s)": idle,
+        "Compute Imbalance": slowest / compute if compute > 0 else None,
+    }
+
+
+class ResultsTable:
+    # One growable structured array with a column per result; missing numbers are NaN, missing text is empty.
+    def __init__(self, columns=COLUMNS, capacity=256):
+        self.columns = list(columns)
+        self.dtype = np.dtype([(column, TEXT_COLUMNS.get(column, np.float64)) for column in self.columns])
+        self.missing = tuple("" if column in TEXT_COLUMNS else np.nan for column in self.columns)
+        self.array = np.empty(capacity, dtype=self.dtype)
+        self.size = 0
+
+    @classmethod
+    def from_columns(cls, columns):
+        size = len(next(iter(columns.values()))) if columns else 0
+        table = cls(list(columns), capacity=max(1, size))
+        for column, values in columns.items():
+            table.array[column][:size] = values
+        table.size = size
+        return table
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, column):
+        return self.array[column][:self.size]
+
+    def append(self, row):
+        if self.size == len(self.array):
+            grown = np.empty(2 * len(self.array), dtype=self.dtype)
+            grown[:self.size] = self.array[:self.size]
+            self.array = grown
+        self.array[self.size] = tuple(missing if value is None else value
+                                      for value, missing in zip(row, self.missing))
+        self.size += 1
+        return self.size - 1
+
+    def set(self, rows, column, values):
+        self.array[column][rows] = np.nan if values is None else values
+
+    def groups(self, *columns):
+        groups = {}
+        for row, key in enumerate(zip(*(self[column].tolist() for column in columns))):
+            groups.setdefault(key, []).append(row)
+        return {key: np.array(rows) for key, rows in groups.items()}
+
+    def records(self, start=0, stop=None):
+        integer = [column in INTEGER_COLUMNS for column in self.columns]
+        for record in self.array[start:self.size if stop is None else stop].tolist():
+            yield [None if value != value or value == "" else int(value) if is_integer else value
+                   for value, is_integer in zip(record, integer)]
+
+
+class MethodSummary:
+    # Folds result rows into one summary row per method and sampler in a single pass.
+    def __init__(self):
+        self.methods = {}
+        self.index = {column: i for i, column in enumerate(COLUMNS)}
+
+    def add(self, row):
+        method, sampler = row[self.index["Method"]], row[self.index["Sampler"]]
+        pi_estimate, num_darts = row[self.index["Pi Estimate"]], row[self.index["Num Darts"]]
+        time_taken = row[self.index["Time Taken (s)"]]
+        summary = self.methods.setdefault((method, sampler), {"Rows": 0, "Times": 0, "Time Sum": 0.0,
+                                                              "Min Time": math.inf, "Max Time": 0.0,
+                                                              "Error Sum": 0.0, "Final": None})
+        summary["Rows"] += 1
+        if pi_estimate is not None:
+            summary["Error Sum"] += abs(math.pi - pi_estimate)
+        if time_taken is not None:
+            summary["Times"] += 1
+            summary["Time Sum"] += time_taken
+            summary["Min Time"] = min(summary["Min Time"], time_taken)
+            summary["Max Time"] = max(summary["Max Time"], time_taken)
+        if num_darts is not None and (summary["Final"] is None or num_darts >= summary["Final"][0]):
+            summary["Final"] = num_darts, pi_estimate, row[self.index["Std Error"]]
+
+    def rows(self):
+        for (method, sampler), summary in self.methods.items():
+            final = summary["Final"] or (None, None, None)
+            times = summary["Times"]
+            yield [method, sampler, summary["Rows"], *final,
+                   summary["Time Sum"] / times if times else None, summary["Min Time"] if times else None,
+                   summary["Max Time"] if times else None, summary["Error Sum"] / summary["Rows"]]
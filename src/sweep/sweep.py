@@ -0,0 +1,70 @@
+import math
+import time
+import numpy as np
+from src.results.results import confidence_z
+
+
+def target_standard_error(target_error=None, target_ci=None, confidence=0.95):
+    if target_ci:
+        return target_ci / (2 * confidence_z(confidence))
+    return target_error
+
+
+def darts_for_error(pi_estimate, target_error):
+    hit_fraction = pi_estimate / 4
+    return math.ceil(16 * hit_fraction * (1 - hit_fraction) / target_error ** 2)
+
+
+def plan_next_batch(results, rows, target_error, num_darts_per_process, dart_step, size):
+    # The slowest-converging method of the iteration decides, so every method reaches the target.
+    if not rows:
+        return False, num_darts_per_process + dart_step
+    worst = rows[int(np.argmax(results["Std Error"][rows]))]
+    if results["Std Error"][worst] <= target_error:
+        return True, num_darts_per_process
+    darts_needed = darts_for_error(results["Pi Estimate"][worst], target_error)
+    return False, max(num_darts_per_process + dart_step, -(-darts_needed // size))
+
+
+class TimeBudgetScheduler:
+    def __init__(self, duration, start_time=None, incremental=False, smoothing=0.5):
+        self.duration = duration
+        self.start_time = start_time if start_time is not None else time.time()
+        self.incremental = incremental
+        self.smoothing = smoothing
+        self.seconds_per_dart = None
+        self.darts_per_process = 0
+
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    def slack(self):
+        return self.duration - self.elapsed()
+
+    def new_darts(self, num_darts_per_process, previous_darts_per_process):
+        return num_darts_per_process - previous_darts_per_process if self.incremental else num_darts_per_process
+
+    def record(self, num_darts_per_process, seconds):
+        darts = self.new_darts(num_darts_per_process, self.darts_per_process)
+        self.darts_per_process = num_darts_per_process
+        if darts <= 0:
+            return
+        cost = seconds / darts
+        if self.seconds_per_dart is None:
+            self.seconds_per_dart = cost
+        else:
+            self.seconds_per_dart = self.smoothing * cost + (1 - self.smoothing) * self.seconds_per_dart
+
+    def plan(self, num_darts_per_process, next_darts_per_process):
+        # Returns (stop, darts per process); the next batch is shrunk when it would overrun the budget.
+        remaining = self.slack()
+        if remaining <= 0:
+            return True, next_darts_per_process
+        if self.seconds_per_dart is None:
+            return False, next_darts_per_process
+        if self.new_darts(next_darts_per_process, num_darts_per_process) * self.seconds_per_dart <= remaining:
+            return False, next_darts_per_process
+        affordable = int(remaining / self.seconds_per_dart)
+        if affordable < 1:
+            return True, next_darts_per_process
+        return False, num_darts_per_process + affordable if self.incremental else affordable
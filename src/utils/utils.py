@@ -1,9 +1,28 @@
 import sys
 import os
+import argparse
+import queue
+import atexit
 import logging
+import logging.handlers
 from colorama import init, Fore
 import datetime
 
+LOG_FILE = "../app.log"
+LOG_LEVELS = {"debug": logging.DEBUG, "info": logging.INFO, "": logging.INFO, "warning": logging.WARNING,
+              "error": logging.ERROR}
+LOG_COLORS = {logging.DEBUG: Fore.MAGENTA, logging.INFO: Fore.GREEN, logging.WARNING: Fore.YELLOW,
+              logging.ERROR: Fore.RED}
+LOG_FORMAT = "%(asctime)s - %(levelname)s - [rank %(rank)s] %(message)s"
+CONSOLE_FORMAT = "[%(asctime)s] [rank %(rank)s] [%(levelname)s]: %(message)s"
+
+_log = logging.getLogger("bogy")
+_log.propagate = False
+_listener = None
+_buffer = None
+_rank = 0
+_per_rank = False
+
 
 def debug_mode():
     return os.getenv("DEBUG_MODE", "").lower() == "true"
@@ -13,62 +32,143 @@ def generate_timestamp():
     return datetime.datetime.now().strftime("%Y-%d-%m_%H-%M-%S")
 
 
-def logger(message, level='info'):
-    if debug_mode():
-        log_message = f"[{generate_timestamp()}] [{logging.getLogger(__name__)}] [{level.upper()}]: {message}"
-
-        if level.lower() == 'info':
-            logging.info(log_message)
-            print(Fore.GREEN + log_message + Fore.RESET)
-        elif level.lower() == 'debug':
-            logging.debug(log_message)
-            print(Fore.MAGENTA + log_message + Fore.RESET)
-        elif level.lower() == 'warning':
-            logging.warning(log_message)
-            print(Fore.YELLOW + log_message + Fore.RESET)
-        elif level.lower() == 'error':
-            logging.error(log_message)
-            print(Fore.RED + log_message + Fore.RESET)
-        elif level.lower() == '':
-            logging.info(log_message)
-            print(Fore.WHITE + log_message + Fore.RESET)
-        else:
-            logging.error("There is a misconfiguration with the logger")
+class RankFilter(logging.Filter):
+    def __init__(self, rank):
+        super().__init__()
+        self.rank = rank
+
+    def filter(self, record):
+        record.rank = self.rank
+        return True
+
+
+class ColorFormatter(logging.Formatter):
+    def format(self, record):
+        return LOG_COLORS.get(record.levelno, Fore.WHITE) + super().format(record) + Fore.RESET
+
+
+class BufferHandler(logging.Handler):
+    # Holds a rank's log lines until gather_logs hands them to rank 0.
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def environment_rank():
+    # mpirun exports the rank, so messages logged before main() has a communicator are tagged correctly too.
+    for variable in ("OMPI_COMM_WORLD_RANK", "PMI_RANK"):
+        if os.getenv(variable, "").isdigit():
+            return int(os.environ[variable])
+    return 0
+
+
+def setup_logging(rank=None, per_rank=False, filename=LOG_FILE):
+    # logger() only puts records on a queue; a listener thread formats them and does the file and console I/O.
+    # With per_rank every rank writes its own file, otherwise only rank 0 does and the other ranks buffer
+    # their lines until gather_logs.
+    global _listener, _buffer, _rank, _per_rank
+    # Lines buffered before main() knew its communicator are kept for the new buffer.
+    buffered = _buffer.lines if _buffer is not None else []
+    stop_logging()
+    _rank = environment_rank() if rank is None else rank
+    _per_rank = per_rank
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(ColorFormatter(CONSOLE_FORMAT))
+    if per_rank:
+        base, extension = os.path.splitext(filename)
+        file = logging.FileHandler(f"{base}.rank{_rank}{extension}")
+        file.stream.writelines(f"{line}\n" for line in buffered)
+        _buffer = None
+    elif _rank == 0:
+        file = logging.FileHandler(filename)
+        _buffer = None
     else:
-        if level.lower() == 'debug':
-            return
-        elif level.lower() == 'info':
-            return
-        elif level.lower() == '':
-            return
-        else:
-            log_message = f"[{generate_timestamp()}] [{logging.getLogger(__name__)}] [{level.upper()}]: {message}"
-            if level.lower() == 'error':
-                logging.error(log_message)
-                print(Fore.RED + log_message + Fore.RESET)
-            else:
-                logging.error("There is a misconfiguration with the logger")
+        file = _buffer = BufferHandler()
+        _buffer.lines = buffered
+    file.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    _log.handlers = [logging.handlers.QueueHandler(log_queue)]
+    _log.filters = [RankFilter(_rank)]
+    _log.setLevel(logging.DEBUG if debug_mode() else logging.WARNING)
+    _listener = logging.handlers.QueueListener(log_queue, console, file)
+    _listener.start()
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    for handler in _log.handlers:
+        handler.close()
+
+
+def log_directly():
+    # A forked child has no listener thread, so it writes through the parent's handlers itself.
+    global _listener
+    if _listener is not None:
+        _log.handlers = list(_listener.handlers)
+        _listener = None
+
+
+def gather_logs(comm):
+    # Collective: the lines buffered by ranks without a file of their own are appended to rank 0's file.
+    if _listener is None or _per_rank:
+        return
+    _listener.stop()
+    lines = comm.gather(_buffer.lines if _buffer is not None else [], root=0)
+    if _buffer is not None:
+        _buffer.lines = []
+    if _rank == 0:
+        for handler in _listener.handlers:
+            if isinstance(handler, logging.FileHandler):
+                handler.stream.writelines(f"{line}\n" for rank_lines in lines for line in rank_lines)
+                handler.flush()
+    _listener.start()
+
+
+def logger(message, *args, level='info', exc_info=False):
+    # The level check comes before any formatting; %-style args are only merged into the message when the
+    # record is written, so a disabled debug message inside a loop costs a dict lookup and a comparison.
+    levelno = LOG_LEVELS.get(level.lower())
+    if _listener is None and not _log.handlers:
+        setup_logging()
+    if levelno is None:
+        _log.error("There is a misconfiguration with the logger")
+    elif _log.isEnabledFor(levelno):
+        _log.log(levelno, message, *args, exc_info=exc_info)
+
+
+os.register_at_fork(after_in_child=log_directly)
+atexit.register(stop_logging)
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return number
+
+
+def non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative, not {value}")
+    return number
 
 
 def check_folder():
-    excel_folder = "././excel"
-    png_folder = "././png"
-    estimation_folder = "././png/estimation"
-    pi_difference_folder = "././png/pi_difference"
-    runtime_folder = "././png/runtime"
-
-    if not os.path.exists(excel_folder):
-        os.mkdir(excel_folder)
-        logger(f"{excel_folder} folder created", level='warning')
-    if not os.path.exists(png_folder):
-        os.mkdir(png_folder)
-        logger(f"{png_folder} folder created", level='warning')
-    if not os.path.exists(estimation_folder):
-        os.mkdir(estimation_folder)
-        logger(f"{estimation_folder} folder created", level='warning')
-    if not os.path.exists(pi_difference_folder):
-        os.mkdir(pi_difference_folder)
-        logger(f"{excel_folder} folder created", level='warning')
-    if not os.path.exists(runtime_folder):
-        os.mkdir(runtime_folder)
-        logger(f"{excel_folder} folder created", level='warning')
\ No newline at end of file
+    folders = ["././excel", "././png", "././png/estimation", "././png/pi_difference", "././png/runtime"]
+
+    for folder in folders:
+        # exist_ok, so that a folder created by another process in the meantime is no error.
+        if not os.path.exists(folder):
+            os.makedirs(folder, exist_ok=True)
+            logger(f"{folder} folder created", level='warning')